@@ -14,12 +14,39 @@ class Settings(BaseSettings):
 
     GOLD_SCRAPER_URL: str
     TOLA_WEIGHT_GRAM: float
+    RATE_REFRESH_ENABLED: bool = True
+    RATE_REFRESH_SECONDS: int = 60
+    RATE_REFRESH_MAX_BACKOFF_SECONDS: int = 900
+    RATE_MAX_CHANGE_PERCENT: float = 20.0  # scraped 24K price further than this from the stored one is rejected
+    GOLD_RATE_RETENTION_DAYS: int = 30
 
     SMTP_HOST: str = "localhost"
     SMTP_PORT: int = 587
     SMTP_USER: str | None = None
     SMTP_PASSWORD: str | None = None
     SMTP_FROM: str = "no-reply@tayyab.com"
+    SMTP_TIMEOUT_SECONDS: float = 5.0
+
+    MAX_IMAGE_UPLOAD_MB: int = 10
+
+    RESERVATION_TTL_MINUTES: int = 15
+    RESERVATION_SWEEP_SECONDS: int = 30
+
+    STOCK_SNAPSHOT_HOURS: int = 24
+    STOCK_SNAPSHOT_RETENTION_DAYS: int = 365
+
+    LOW_STOCK_THRESHOLD: int = 2
+    LOW_STOCK_DIGEST_SECONDS: int = 300
+    LOW_STOCK_ALERT_EMAIL: str = "admin@tayyab.com"
+
+    IDEMPOTENCY_TTL_HOURS: int = 24
+    IDEMPOTENCY_PURGE_SECONDS: int = 3600
+
+    QUOTE_TTL_MINUTES: int = 10
+
+    OUTBOX_POLL_SECONDS: int = 5
+    OUTBOX_MAX_ATTEMPTS: int = 8
+    OUTBOX_RETENTION_DAYS: int = 7
 
     model_config = {
         "env_file": Path(__file__).parent / ".env",
@@ -1,8 +1,10 @@
 # app/main.py
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import Depends, FastAPI
 from backend.database import engine, Base
 from backend import models  # ensures models are registered with SQLAlchemy
 from backend.configs import settings
+from backend.security import require_admin
 from backend.routes import (
     auth,
     users,
@@ -17,18 +19,49 @@ from backend.routes import (
     address,
     profile,
     cart,
-    notify
+    notify,
+    export
 )
+from backend.services import scheduler
+from backend.services.alerts import flush_low_stock_job
+from backend.services.gold_rates import rate_refresher
+from backend.services.rate_rollups import compact_old_rates_job
+from backend.services.idempotency import purge_expired_job
+from backend.services.outbox import dispatch_job, purge_sent_job
+from backend.services.reservations import sweep_expired_job
+from backend.services.stock_ledger import take_snapshots_job
 from fastapi.middleware.cors import CORSMiddleware
 
 # Create database tables
 Base.metadata.create_all(bind=engine)
 
+# Periodic maintenance jobs, run on daemon threads for the life of the app
+scheduler.register("reservation-sweeper", settings.RESERVATION_SWEEP_SECONDS, sweep_expired_job)
+scheduler.register("stock-snapshots", settings.STOCK_SNAPSHOT_HOURS * 3600, take_snapshots_job)
+scheduler.register("low-stock-digest", settings.LOW_STOCK_DIGEST_SECONDS, flush_low_stock_job)
+scheduler.register("idempotency-purge", settings.IDEMPOTENCY_PURGE_SECONDS, purge_expired_job)
+scheduler.register("outbox-dispatcher", settings.OUTBOX_POLL_SECONDS, dispatch_job)
+scheduler.register("outbox-purge", 24 * 3600, purge_sent_job)
+scheduler.register("gold-rate-retention", 24 * 3600, compact_old_rates_job)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    scheduler.start()
+    if settings.RATE_REFRESH_ENABLED:
+        rate_refresher.start()
+    yield
+    rate_refresher.stop()
+    scheduler.stop()
+    flush_low_stock_job()  # don't lose alerts collected since the last window
+
+
 # Initialize FastAPI application
 app = FastAPI(
     title="Tayyab Jewellers API",
     description="Backend API for Tayyab Jewellers E-commerce Platform",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 app.include_router(auth.router)
 app.include_router(users.router)
@@ -37,12 +70,14 @@ app.include_router(orders.router)
 app.include_router(payments.router)
 app.include_router(rates.router)
 app.include_router(history.router)
+app.include_router(admin.router, dependencies=[Depends(require_admin)])
 app.include_router(inventory.router)
 app.include_router(profile.router)
 app.include_router(address.router)
 app.include_router(wishlist.router)
 app.include_router(cart.router)
 app.include_router(notify.router)
+app.include_router(export.router)
 
 @app.get("/")
 def root():
@@ -70,4 +105,5 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag", "Idempotent-Replayed"],
 )
@@ -0,0 +1,3 @@
+-- Composite keys backing keyset pagination of /products (sort=newest, price_asc/price_desc)
+CREATE INDEX ix_products_created_at_id ON products (created_at, id);
+CREATE INDEX ix_products_price_id ON products (price, id);
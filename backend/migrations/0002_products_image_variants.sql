@@ -0,0 +1,2 @@
+-- {"original", "thumbnail", "medium", "webp"} -> file name, filled in by the image variant job
+ALTER TABLE products ADD COLUMN image_variants JSON NULL;
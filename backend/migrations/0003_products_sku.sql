@@ -0,0 +1,3 @@
+-- Optional merchant SKU; bulk imports upsert on it
+ALTER TABLE products ADD COLUMN sku VARCHAR(64) NULL;
+CREATE UNIQUE INDEX ix_products_sku ON products (sku);
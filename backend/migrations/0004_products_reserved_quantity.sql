@@ -0,0 +1,2 @@
+-- Units held by live cart reservations (see stock_reservations)
+ALTER TABLE products ADD COLUMN reserved_quantity INT NOT NULL DEFAULT 0;
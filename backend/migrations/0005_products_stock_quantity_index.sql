@@ -0,0 +1,2 @@
+-- Low-stock digest scans products below the threshold
+CREATE INDEX ix_products_stock_quantity ON products (stock_quantity);
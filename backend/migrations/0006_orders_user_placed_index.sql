@@ -0,0 +1,2 @@
+-- Customer order history: seek on (user_id, placed_at, id)
+CREATE INDEX ix_orders_user_placed_id ON orders (user_id, placed_at, id);
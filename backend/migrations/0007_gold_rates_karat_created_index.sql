@@ -0,0 +1,2 @@
+-- Newest rate per karat and retention compaction by age
+CREATE INDEX ix_gold_rates_karat_created ON gold_rates (karat, created_at);
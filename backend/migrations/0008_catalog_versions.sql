@@ -0,0 +1,9 @@
+-- Catalog and per-product versions shared by every worker (ETags, detail cache, search index refresh)
+ALTER TABLE products ADD COLUMN version BIGINT NOT NULL DEFAULT 0;
+CREATE INDEX ix_products_version ON products (version);
+
+CREATE TABLE IF NOT EXISTS catalog_state (
+    id INT NOT NULL PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 0
+);
+INSERT IGNORE INTO catalog_state (id, version) VALUES (1, 0);
@@ -1,5 +1,5 @@
 # backend/models.py
-from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, ForeignKey, Text, Date, func
+from sqlalchemy import BigInteger, Column, Integer, String, Float, Boolean, DateTime, ForeignKey, Text, Date, Index, JSON, UniqueConstraint, func
 from sqlalchemy import Enum as SAEnum
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -30,6 +30,7 @@ class User(Base):
 class Product(Base):
     __tablename__ = "products"
     id = Column(Integer, primary_key=True, index=True)
+    sku = Column(String(64), unique=True, index=True, nullable=True)
     name = Column(String(150), nullable=False)
     metal_type = Column(String(20), nullable=False)
     category = Column(String(50), default="ready made")
@@ -37,11 +38,38 @@ class Product(Base):
     weight_grams = Column(Float, nullable=False)
     price = Column(Float, nullable=False)
     making_charge = Column(Float, default=0.0)
-    stock_quantity = Column(Integer, default=0)
+    stock_quantity = Column(Integer, default=0, index=True)
+    reserved_quantity = Column(Integer, default=0, nullable=False)  # units held by live cart reservations
     description = Column(Text, nullable=True)
     images = Column(Text, nullable=True)
+    image_variants = Column(JSON, nullable=True)  # {"original", "thumbnail", "medium", "webp"} -> file name
+    version = Column(BigInteger, default=0, nullable=False, index=True)  # CatalogState.version of its last change
     created_at = Column(DateTime, default=datetime.utcnow)
 
+    # Composite keys backing keyset pagination (see reprossitories/product_repo.py)
+    __table_args__ = (
+        Index("ix_products_created_at_id", "created_at", "id"),
+        Index("ix_products_price_id", "price", "id"),
+    )
+
+    @property
+    def available_quantity(self) -> int:
+        return (self.stock_quantity or 0) - (self.reserved_quantity or 0)
+
+
+class CatalogState(Base):
+    """Single row whose version is bumped in every transaction that changes products (see services/catalog.py)."""
+    __tablename__ = "catalog_state"
+    id = Column(Integer, primary_key=True)
+    version = Column(BigInteger, default=0, nullable=False)
+
+
+class JobRun(Base):
+    """When a scheduled job last ran in any worker process (see services/scheduler.py claim_run)."""
+    __tablename__ = "job_runs"
+    name = Column(String(50), primary_key=True)
+    last_run_at = Column(DateTime, nullable=False)
+
 
 class Order(Base):
     __tablename__ = "orders"
@@ -56,6 +84,9 @@ class Order(Base):
     user = relationship("User", back_populates="orders")
     items = relationship("OrderItem", back_populates="order", cascade="all, delete-orphan")
 
+    # customer order history: seek on (user_id, placed_at, id)
+    __table_args__ = (Index("ix_orders_user_placed_id", "user_id", "placed_at", "id"),)
+
 
 class OrderItem(Base):
     __tablename__ = "order_items"
@@ -98,6 +129,27 @@ class GoldRate(Base):
     source = Column(String(50), default="live")
     created_at = Column(DateTime, default=datetime.utcnow)
 
+    __table_args__ = (Index("ix_gold_rates_karat_created", "karat", "created_at"),)
+
+
+class GoldRateRollup(Base):
+    """Open/high/low/close of price_per_tola per karat over one time bucket."""
+    __tablename__ = "gold_rate_rollups"
+    id = Column(Integer, primary_key=True)
+    karat = Column(Integer, nullable=False)
+    resolution = Column(String(10), nullable=False)  # minute, hour, day
+    bucket_start = Column(DateTime, nullable=False)
+    open = Column(Float, nullable=False)
+    high = Column(Float, nullable=False)
+    low = Column(Float, nullable=False)
+    close = Column(Float, nullable=False)
+    tick_count = Column(Integer, default=0, nullable=False)
+    # oldest and newest gold_rates rows folded in; ids between them are already counted
+    first_tick_id = Column(Integer, nullable=False)
+    last_tick_id = Column(Integer, nullable=False)
+
+    __table_args__ = (UniqueConstraint("karat", "resolution", "bucket_start", name="uq_gold_rate_rollup_bucket"),)
+
 
 class GoldRateHistory(Base):
     __tablename__ = "gold_rate_history"
@@ -174,3 +226,71 @@ class Cart(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     user = relationship("User", back_populates="cart_items")
     product = relationship("Product")
+
+
+class StockReservation(Base):
+    __tablename__ = "stock_reservations"
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    product_id = Column(Integer, ForeignKey("products.id"), nullable=False)
+    quantity = Column(Integer, nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (UniqueConstraint("user_id", "product_id", name="uq_reservation_user_product"),)
+
+
+class StockMovement(Base):
+    """Append-only ledger of every change to Product.stock_quantity."""
+    __tablename__ = "stock_movements"
+    id = Column(Integer, primary_key=True)
+    product_id = Column(Integer, ForeignKey("products.id"), nullable=False)
+    delta = Column(Integer, nullable=False)
+    reason = Column(String(30), nullable=False)
+    reference_id = Column(Integer, nullable=True)  # e.g. the order id
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (Index("ix_stock_movements_product_created", "product_id", "created_at", "id"),)
+
+
+class StockSnapshot(Base):
+    __tablename__ = "stock_snapshots"
+    id = Column(Integer, primary_key=True)
+    product_id = Column(Integer, ForeignKey("products.id"), nullable=False)
+    quantity = Column(Integer, nullable=False)
+    movement_id = Column(Integer, nullable=False)  # newest movement already reflected in quantity
+    taken_at = Column(DateTime, nullable=False)
+
+    __table_args__ = (Index("ix_stock_snapshots_product_taken", "product_id", "taken_at"),)
+
+
+class IdempotencyKey(Base):
+    """Stored response for a client-supplied Idempotency-Key, replayed on retries."""
+    __tablename__ = "idempotency_keys"
+    id = Column(Integer, primary_key=True)
+    scope = Column(String(40), nullable=False)  # endpoint plus owner, e.g. "orders:42"
+    key = Column(String(64), nullable=False)
+    fingerprint = Column(String(64), nullable=False)  # sha256 of the request body
+    status_code = Column(Integer, nullable=True)
+    response_body = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
+
+    __table_args__ = (UniqueConstraint("scope", "key", name="uq_idempotency_scope_key"),)
+
+
+class OutboxMessage(Base):
+    """Side effect (e.g. an email) recorded in the same transaction as the change that caused it."""
+    __tablename__ = "outbox_messages"
+    id = Column(Integer, primary_key=True)
+    topic = Column(String(50), nullable=False)
+    payload = Column(JSON, nullable=False)
+    status = Column(String(20), default="pending", nullable=False)  # pending, sent, dead
+    attempts = Column(Integer, default=0, nullable=False)
+    available_at = Column(DateTime, default=datetime.utcnow, nullable=False)  # next attempt
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    sent_at = Column(DateTime, nullable=True)
+
+    # the dispatcher polls "pending and due" oldest first
+    __table_args__ = (Index("ix_outbox_status_available", "status", "available_at", "id"),)
@@ -0,0 +1,80 @@
+# repositories/product_repo.py
+
+from sqlalchemy import or_
+from sqlalchemy.orm import Query, Session
+from backend.models import Product
+from backend.schemas import ProductFilter
+from backend.utils.pagination import encode_cursor, decode_cursor
+
+# sort name -> (column, descending). Every ordering is tie-broken on Product.id
+# in the same direction, so (column, id) is unique and pages never overlap.
+PRODUCT_SORTS = {
+    "newest": (Product.created_at, True),
+    "oldest": (Product.created_at, False),
+    "price_asc": (Product.price, False),
+    "price_desc": (Product.price, True),
+}
+
+
+def apply_filters(q: Query, filters: ProductFilter) -> Query:
+    if filters.min_price:
+        q = q.filter(Product.price >= filters.min_price)
+    if filters.max_price:
+        q = q.filter(Product.price <= filters.max_price)
+    if filters.metal_type:
+        q = q.filter(Product.metal_type == filters.metal_type)
+    if filters.karat:
+        q = q.filter(Product.karat == filters.karat)
+    if filters.category:
+        q = q.filter(Product.category == filters.category)
+    if filters.in_stock:
+        q = q.filter(Product.stock_quantity - Product.reserved_quantity > 0)
+    return q
+
+
+def apply_keyset(q: Query, sort: str, cursor: str | None = None) -> Query:
+    """
+    Order the query by (sort column, id) and, when a cursor is given, seek
+    straight past the last row of the previous page instead of using OFFSET.
+    Raises ValueError for an unknown sort or a malformed cursor.
+    """
+    if sort not in PRODUCT_SORTS:
+        raise ValueError(f"Unknown sort '{sort}'")
+    column, descending = PRODUCT_SORTS[sort]
+
+    if cursor:
+        last_value, last_id = decode_cursor(cursor, sort, 2)
+        # The redundant leading bound lets the planner range-scan the composite index.
+        if descending:
+            q = q.filter(column <= last_value, or_(column < last_value, Product.id < last_id))
+        else:
+            q = q.filter(column >= last_value, or_(column > last_value, Product.id > last_id))
+
+    if descending:
+        return q.order_by(column.desc(), Product.id.desc())
+    return q.order_by(column.asc(), Product.id.asc())
+
+
+def next_cursor(rows: list[Product], sort: str, limit: int) -> str | None:
+    """Cursor for the page after `rows`, or None when this was the last page."""
+    if len(rows) < limit:
+        return None
+    column, _ = PRODUCT_SORTS[sort]
+    last = rows[-1]
+    return encode_cursor(sort, getattr(last, column.key), last.id)
+
+
+def lock_products(db: Session, product_ids) -> dict[int, Product]:
+    """
+    Load the given products in one query with SELECT ... FOR UPDATE. Rows are
+    locked in id order so two checkouts touching the same products can't
+    deadlock; the locks are held until the caller commits or rolls back.
+    """
+    rows = (
+        db.query(Product)
+        .filter(Product.id.in_(sorted(set(product_ids))))
+        .order_by(Product.id)
+        .with_for_update()
+        .all()
+    )
+    return {product.id: product for product in rows}
@@ -4,6 +4,8 @@ from sqlalchemy.orm import Session
 from backend.database import get_db
 from backend.models import Order, User, OrderItem, Product
 from backend.security import require_admin
+from backend.services import outbox
+from backend.services.cache import cache_stats
 from datetime import date
 
 router = APIRouter(prefix="/admin", tags=["admin"])
@@ -33,3 +35,13 @@ def admin_dashboard(admin=Depends(require_admin), db: Session = Depends(get_db))
         "todays_orders": int(todays_orders),
         "best_products": best_products
     }
+
+
+@router.get("/cache-stats")
+def get_cache_stats(admin=Depends(require_admin)):
+    return {"caches": cache_stats()}
+
+
+@router.get("/outbox-stats")
+def get_outbox_stats(admin=Depends(require_admin), db: Session = Depends(get_db)):
+    return outbox.stats(db)
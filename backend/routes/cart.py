@@ -5,12 +5,13 @@ from typing import List
 from backend import models, schemas
 from backend.database import get_db
 from backend.security import get_current_user
+from backend.services import reservations
 
 router = APIRouter(prefix="/api/cart", tags=["Cart"])
 
 
 @router.get("/", response_model=List[schemas.CartItemResponse])
-async def get_cart_items(
+def get_cart_items(
         db: Session = Depends(get_db),
         current_user: models.User = Depends(get_current_user)
 ):
@@ -22,25 +23,21 @@ async def get_cart_items(
 
 
 @router.post("/", response_model=schemas.CartItemResponse)
-async def add_to_cart(
+def add_to_cart(
         item: schemas.CartCreate,
         db: Session = Depends(get_db),
         current_user: models.User = Depends(get_current_user)
 ):
-    """Add product to cart"""
-    # Check if product exists
-    product = db.query(models.Product).filter(
-        models.Product.id == item.product_id
-    ).first()
-    if not product:
-        raise HTTPException(status_code=404, detail="Product not found")
-
+    """Add product to cart and hold the stock for the reservation TTL"""
     # Check if item already in cart
     existing = db.query(models.Cart).filter(
         models.Cart.user_id == current_user.id,
         models.Cart.product_id == item.product_id
     ).first()
 
+    # Raises 404 for an unknown product and 409 when the pieces aren't available
+    reservations.hold(db, current_user.id, item.product_id, item.quantity + (existing.quantity if existing else 0))
+
     if existing:
         existing.quantity += item.quantity
         db.commit()
@@ -60,7 +57,7 @@ async def add_to_cart(
 
 
 @router.put("/{item_id}", response_model=schemas.CartItemResponse)
-async def update_cart_item(
+def update_cart_item(
         item_id: int,
         item_update: schemas.CartUpdate,
         db: Session = Depends(get_db),
@@ -75,6 +72,7 @@ async def update_cart_item(
     if not cart_item:
         raise HTTPException(status_code=404, detail="Cart item not found")
 
+    reservations.hold(db, current_user.id, cart_item.product_id, item_update.quantity)
     cart_item.quantity = item_update.quantity
     db.commit()
     db.refresh(cart_item)
@@ -82,7 +80,7 @@ async def update_cart_item(
 
 
 @router.delete("/{item_id}")
-async def remove_from_cart(
+def remove_from_cart(
         item_id: int,
         db: Session = Depends(get_db),
         current_user: models.User = Depends(get_current_user)
@@ -96,6 +94,7 @@ async def remove_from_cart(
     if not cart_item:
         raise HTTPException(status_code=404, detail="Cart item not found")
 
+    reservations.release(db, current_user.id, cart_item.product_id)
     db.delete(cart_item)
     db.commit()
     return {"message": "Item removed from cart"}
\ No newline at end of file
@@ -0,0 +1,146 @@
+# backend/routes/export.py
+import csv
+import io
+import json
+from datetime import datetime
+from enum import Enum
+from typing import Iterator, Literal
+
+from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
+
+from backend.database import SessionLocal
+from backend.models import Order, OrderItem, Payment, Product
+from backend.security import require_admin
+
+router = APIRouter(prefix="/export", tags=["export"])
+
+YIELD_PER = 1000        # rows fetched per round trip from the server-side cursor
+FLUSH_EVERY = 500       # rows buffered before a chunk is sent to the client
+
+PRODUCT_COLUMNS = [
+    Product.id, Product.sku, Product.name, Product.metal_type, Product.category, Product.karat,
+    Product.weight_grams, Product.price, Product.making_charge, Product.stock_quantity, Product.created_at,
+]
+ORDER_COLUMNS = [
+    Order.id, Order.user_id, Order.status, Order.total_price,
+    Order.delivery_address, Order.delivery_region, Order.placed_at,
+]
+ORDER_ITEM_COLUMNS = [
+    OrderItem.id.label("item_id"), OrderItem.product_id, OrderItem.quantity,
+    OrderItem.unit_price, OrderItem.total_price.label("item_total_price"),
+]
+PAYMENT_COLUMNS = [
+    Payment.id, Payment.order_id, Payment.method, Payment.amount, Payment.status, Payment.currency,
+    Payment.bank_name, Payment.transaction_id, Payment.transaction_date, Payment.paid_at, Payment.created_at,
+]
+
+ExportFormat = Literal["csv", "ndjson"]
+
+
+def _plain(value):
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def _rows(build_query) -> Iterator[dict]:
+    """Iterate a query through a server-side cursor on a session owned by the stream."""
+    db = SessionLocal()
+    try:
+        for row in build_query(db).yield_per(YIELD_PER):
+            yield {key: _plain(value) for key, value in row._mapping.items()}
+    finally:
+        db.close()
+
+
+def _encode(rows: Iterator[dict], fmt: ExportFormat, fieldnames: list[str]) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=fieldnames) if fmt == "csv" else None
+    if writer:
+        writer.writeheader()
+    for count, row in enumerate(rows, start=1):
+        if writer:
+            writer.writerow(row)
+        else:
+            buffer.write(json.dumps(row) + "\n")
+        if count % FLUSH_EVERY == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def _response(chunks: Iterator[str], name: str, fmt: ExportFormat) -> StreamingResponse:
+    media_type = "text/csv" if fmt == "csv" else "application/x-ndjson"
+    filename = f"{name}-{datetime.utcnow():%Y%m%d%H%M%S}.{fmt}"
+    return StreamingResponse(
+        chunks, media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+def _group_order_items(rows: Iterator[dict]) -> Iterator[dict]:
+    """Fold the flat order x item join (ordered by order id) into one object per order."""
+    item_keys = [c.key for c in ORDER_ITEM_COLUMNS]
+    current = None
+    for row in rows:
+        if current is None or current["id"] != row["id"]:
+            if current is not None:
+                yield current
+            current = {key: value for key, value in row.items() if key not in item_keys}
+            current["items"] = []
+        if row["item_id"] is not None:
+            current["items"].append({key: row[key] for key in item_keys})
+    if current is not None:
+        yield current
+
+
+@router.get("/products")
+def export_products(format: ExportFormat = "csv", admin=Depends(require_admin)):
+    rows = _rows(lambda db: db.query(*PRODUCT_COLUMNS).order_by(Product.id))
+    return _response(_encode(rows, format, [c.key for c in PRODUCT_COLUMNS]), "products", format)
+
+
+@router.get("/orders")
+def export_orders(
+    format: ExportFormat = "csv",
+    date_from: datetime | None = None,
+    date_to: datetime | None = None,
+    admin=Depends(require_admin)
+):
+    """One CSV line per order item; in NDJSON each order carries its items."""
+    def build_query(db):
+        q = db.query(*ORDER_COLUMNS, *ORDER_ITEM_COLUMNS).outerjoin(OrderItem, OrderItem.order_id == Order.id)
+        if date_from:
+            q = q.filter(Order.placed_at >= date_from)
+        if date_to:
+            q = q.filter(Order.placed_at < date_to)
+        return q.order_by(Order.id, OrderItem.id)
+
+    rows = _rows(build_query)
+    if format == "ndjson":
+        rows = _group_order_items(rows)
+    fieldnames = [c.key for c in ORDER_COLUMNS + ORDER_ITEM_COLUMNS]
+    return _response(_encode(rows, format, fieldnames), "orders", format)
+
+
+@router.get("/payments")
+def export_payments(
+    format: ExportFormat = "csv",
+    date_from: datetime | None = None,
+    date_to: datetime | None = None,
+    admin=Depends(require_admin)
+):
+    def build_query(db):
+        q = db.query(*PAYMENT_COLUMNS)
+        if date_from:
+            q = q.filter(Payment.created_at >= date_from)
+        if date_to:
+            q = q.filter(Payment.created_at < date_to)
+        return q.order_by(Payment.id)
+
+    rows = _rows(build_query)
+    return _response(_encode(rows, format, [c.key for c in PAYMENT_COLUMNS]), "payments", format)
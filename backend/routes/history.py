@@ -1,8 +1,9 @@
 # Enhanced routes/history.py
+from datetime import datetime, timedelta
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from backend.database import get_db
-from backend.models import GoldRateHistory, GoldAnalysisPost, GoldRate
+from backend.models import GoldRateHistory, GoldAnalysisPost, GoldRateRollup
 from backend.schemas import GoldHistoryIn, GoldAnalysisCreate, GoldAnalysisOut
 from typing import List
 
@@ -76,23 +77,35 @@ def get_gold_analysis_posts(
 
 
 @router.get("/analysis/trends")
-def get_current_gold_trends(db: Session = Depends(get_db)):
+def get_current_gold_trends(karat: int = 24, db: Session = Depends(get_db)):
     """Get current gold market trends analysis"""
-    # Analyze recent gold rates for trends
-    recent_rates = db.query(GoldRate).order_by(GoldRate.created_at.desc()).limit(30).all()
-
-    if len(recent_rates) < 2:
+    # Daily candles of the last 30 days for one karat, straight from the rollups
+    now = datetime.utcnow()
+    days = (
+        db.query(GoldRateRollup)
+        .filter(
+            GoldRateRollup.karat == karat,
+            GoldRateRollup.resolution == "day",
+            GoldRateRollup.bucket_start >= now - timedelta(days=30),
+        )
+        .order_by(GoldRateRollup.bucket_start.desc())
+        .all()
+    )
+
+    if len(days) < 2:
         return {"trend": "neutral", "message": "Insufficient data for trend analysis"}
 
-    recent_prices = [r.price_per_tola for r in recent_rates]
-    week_avg = sum(recent_prices[:7]) / 7
-    month_avg = sum(recent_prices) / len(recent_prices)
+    closes = [d.close for d in days]
+    week = [d.close for d in days if d.bucket_start >= now - timedelta(days=7)]
+    week_avg = sum(week) / len(week) if week else None
+    month_avg = sum(closes) / len(closes)
 
-    current_price = recent_prices[0]
+    current_price = closes[0]
     trend = "bullish" if current_price > month_avg else "bearish"
-    volatility = (max(recent_prices) - min(recent_prices)) / month_avg * 100
+    volatility = (max(d.high for d in days) - min(d.low for d in days)) / month_avg * 100
 
     return {
+        "karat": karat,
         "current_price": current_price,
         "trend": trend,
         "weekly_average": week_avg,
@@ -1,10 +1,17 @@
 # app/routes/inventory.py
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import datetime
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 import logging
 from backend.database import get_db
 from backend.models import Product
+from backend.reprossitories import product_repo
+from backend.schemas import StockBulkAdjust, StockMovementOut
 from backend.security import require_admin
+from backend.services import stock_ledger
+from backend.services.catalog import mark_changed
 
 router = APIRouter(prefix="/inventory", tags=["inventory"])
 
@@ -18,15 +25,18 @@ def update_stock(
         db: Session = Depends(get_db),
         admin=Depends(require_admin)
 ):
-    product = db.query(Product).filter(Product.id == product_id).first()
+    product = product_repo.lock_products(db, [product_id]).get(product_id)
     if not product:
         raise HTTPException(404, "Product not found")
 
     new_stock = product.stock_quantity + adjustment
     if new_stock < 0:
+        db.rollback()
         raise HTTPException(400, "Insufficient stock")
 
     product.stock_quantity = new_stock
+    stock_ledger.record(db, product_id, adjustment, stock_ledger.ADJUSTMENT)
+    mark_changed(db, [product_id])
     db.commit()
 
     logger.info(f"Stock updated for product {product_id} ({product.name}): {adjustment}. New stock: {new_stock}")
@@ -40,16 +50,45 @@ def update_stock(
     }
 
 
+@router.post("/stock/bulk")
+def bulk_update_stock(
+        payload: StockBulkAdjust,
+        db: Session = Depends(get_db),
+        admin=Depends(require_admin)
+):
+    """
+    Apply many stock adjustments at once (e.g. after a stock-take)
+
+    - Each item carries either a `delta` or an absolute `count`
+    - All or nothing: if any product is missing or would go negative,
+      nothing is written and the per-item report comes back with a 400
+    - Admin authorization required
+    """
+    applied, results = stock_ledger.adjust_stock(db, payload.items)
+    if not applied:
+        db.rollback()
+        raise HTTPException(400, {"message": "No stock was changed", "results": results})
+    changed = list({r["product_id"] for r in results if r["delta"]})
+    mark_changed(db, changed)
+    db.commit()
+    logger.info(f"Bulk stock update: {len(results)} adjustments, {len(changed)} products changed")
+
+    return {"message": "Stock updated successfully", "results": results}
+
+
 @router.get("/low-stock")
 def get_low_stock_products(
         threshold: int = 5,  # Default threshold for low stock
         db: Session = Depends(get_db),
         admin=Depends(require_admin)
 ):
-
-    low_stock_products = db.query(Product).filter(
-        Product.stock_quantity <= threshold
-    ).all()
+    # range scan on the stock_quantity index, fetching only the listed columns
+    low_stock_products = (
+        db.query(Product.id, Product.name, Product.stock_quantity, Product.category)
+        .filter(Product.stock_quantity <= threshold)
+        .order_by(Product.stock_quantity, Product.id)
+        .all()
+    )
 
     return {
         "threshold": threshold,
@@ -69,22 +108,35 @@ def get_low_stock_products(
 @router.get("/stock-history/{product_id}")
 def get_stock_history(
         product_id: int,
+        limit: int = Query(50, ge=1, le=500),
+        cursor: Optional[str] = None,
+        at: Optional[datetime] = None,
         db: Session = Depends(get_db),
         admin=Depends(require_admin)
 ):
     """
-    🆕 NEW ENDPOINT: Get stock history for a product
+    Stock movements for a product, newest first
 
-    - For auditing and tracking inventory changes
+    - Pass next_cursor back as `cursor` for the following page
+    - `at` also returns the stock level at that moment
     - Admin authorization required
     """
     product = db.query(Product).filter(Product.id == product_id).first()
     if not product:
         raise HTTPException(404, "Product not found")
 
-    return {
+    try:
+        movements, next_cursor = stock_ledger.history(db, product_id, cursor, limit)
+    except ValueError:
+        raise HTTPException(400, "Invalid cursor")
+
+    result = {
         "product_id": product.id,
         "product_name": product.name,
         "current_stock": product.stock_quantity,
-        "message": "For detailed history, implement StockHistory model"
-    }
\ No newline at end of file
+        "movements": [StockMovementOut.model_validate(m) for m in movements],
+        "next_cursor": next_cursor,
+    }
+    if at is not None:
+        result["stock_at"] = {"at": at, "quantity": stock_ledger.stock_at(db, product, at)}
+    return result
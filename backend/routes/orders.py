@@ -1,58 +1,141 @@
-import asyncio
-from typing import List
+from collections import defaultdict
+from typing import List, Optional, Union
 
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, logger
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Header, Query, Response
+from sqlalchemy import insert
+from sqlalchemy.orm import Session, load_only, selectinload
 from backend.database import get_db
-from backend.models import Order, OrderItem, Product, User
-from backend.schemas import OrderCreate, OrderOut
+from backend.models import Order, OrderItem, User
+from backend.schemas import OrderCreate, OrderOut, OrderStatus, OrderStatusBulkUpdate, OrderSummary, QuoteRequest, QuoteOut
+from backend.reprossitories import product_repo
 from backend.security import require_admin, get_current_user
-from backend.services.email_services import send_email_smtp, send_order_status_email
+from backend.services.catalog import mark_changed
+from backend.services import idempotency, order_status, outbox, quotes, reservations, stock_ledger
+from backend.services.logger import logger
+from backend.services.alerts import low_stock_alerts
 from backend.utils.discount import calculate_loyalty_discount
+from backend.utils.pagination import encode_cursor, decode_cursor
 
 router = APIRouter(prefix="/orders", tags=["orders"])
-LOW_STOCK_THRESHOLD = 2
 # Add this to backend/routes/orders.py
-@router.get("/me", response_model=List[OrderOut])
+@router.get("/me", response_model=Union[List[OrderOut], List[OrderSummary]])
 def get_my_orders(
+    response: Response,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    summary: bool = False,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    orders = db.query(Order).filter(Order.user_id == current_user.id).order_by(Order.placed_at.desc()).all()
-    return orders
+    """
+    The customer's orders, newest first. Pass X-Next-Cursor back as `cursor`
+    for the next page; `summary=true` leaves out the line items.
+    """
+    q = db.query(Order).filter(Order.user_id == current_user.id)
+    if cursor:
+        try:
+            placed_at, order_id = decode_cursor(cursor, "orders", 2)
+        except ValueError as e:
+            raise HTTPException(400, str(e))
+        q = q.filter(Order.placed_at <= placed_at, (Order.placed_at < placed_at) | (Order.id < order_id))
+    if summary:
+        q = q.options(load_only(Order.id, Order.status, Order.total_price, Order.delivery_region, Order.placed_at))
+    else:
+        # all lines for the page in one extra query instead of one per order
+        q = q.options(selectinload(Order.items))
+    orders = q.order_by(Order.placed_at.desc(), Order.id.desc()).limit(limit).all()
+
+    if len(orders) == limit:
+        response.headers["X-Next-Cursor"] = encode_cursor("orders", orders[-1].placed_at, orders[-1].id)
+    schema = OrderSummary if summary else OrderOut
+    return [schema.model_validate(order) for order in orders]
+@router.post("/quote", response_model=QuoteOut)
+def quote_order(quote_in: QuoteRequest, db: Session = Depends(get_db)):
+    """
+    Price a cart and lock it for QUOTE_TTL_MINUTES. Send quote_token with
+    the order to be charged these prices even if gold moves meanwhile.
+    """
+    wanted: dict[int, int] = defaultdict(int)
+    for item in quote_in.items:
+        if item.quantity <= 0:
+            raise HTTPException(400, "Quantity must be positive")
+        wanted[item.product_id] += item.quantity
+
+    prices = quotes.price_items(db, wanted)
+    token, expires_at = quotes.issue(quote_in.user_id, wanted, prices)
+    items = [
+        {"product_id": item.product_id, "quantity": item.quantity,
+         "unit_price": prices[item.product_id], "total_price": prices[item.product_id] * item.quantity}
+        for item in quote_in.items
+    ]
+    return {
+        "quote_token": token,
+        "expires_at": expires_at,
+        "total_price": sum(item["total_price"] for item in items),
+        "items": items,
+    }
+
+
 @router.post("/", response_model=OrderOut)
-def create_order(order_in: OrderCreate, background: BackgroundTasks, db: Session = Depends(get_db)):
-    total_price = 0
-    order_items = []
+def create_order(
+    order_in: OrderCreate,
+    db: Session = Depends(get_db),
+    idempotency_key: Optional[str] = Header(None),
+):
+    # a retried request with the same Idempotency-Key gets the original order back
+    claim = idempotency.claim(db, f"orders:{order_in.user_id}", idempotency_key, order_in)
+    if isinstance(claim, Response):
+        return claim
+
     user = db.query(User).filter(User.id == order_in.user_id).first()
     if not user:
         raise HTTPException(404, "User not found")
 
+    # The same product on two lines draws on the same stock
+    wanted: dict[int, int] = defaultdict(int)
     for item in order_in.items:
-        product = db.query(Product).filter(Product.id == item.product_id).first()
+        if item.quantity <= 0:
+            raise HTTPException(400, "Quantity must be positive")
+        wanted[item.product_id] += item.quantity
+    # a valid quote fixes the prices the customer saw; no repricing at submit time
+    quoted_prices = quotes.verify(order_in.quote_token, order_in.user_id, wanted) if order_in.quote_token else None
+
+    # One round trip for every product, row-locked so concurrent checkouts queue
+    # here instead of both passing the stock check
+    products = product_repo.lock_products(db, wanted)
+    # the customer's own cart holds become sellable to them
+    reservations.consume(db, order_in.user_id, products)
+    for product_id, quantity in wanted.items():
+        product = products.get(product_id)
         if not product:
-            raise HTTPException(404, f"Product {item.product_id} not found")
-        if product.stock_quantity < item.quantity:
+            db.rollback()
+            raise HTTPException(404, f"Product {product_id} not found")
+        if product.available_quantity < quantity:
+            db.rollback()
             raise HTTPException(400, f"Not enough stock for product {product.name}")
 
-        unit_price = product.price + product.making_charge
+    total_price = 0
+    item_rows = []
+    for item in order_in.items:
+        if quoted_prices is not None:
+            unit_price = quoted_prices[item.product_id]
+        else:
+            product = products[item.product_id]
+            unit_price = product.price + product.making_charge
         total = unit_price * item.quantity
         total_price += total
-        order_items.append(OrderItem(
-            product_id=item.product_id,
-            quantity=item.quantity,
-            unit_price=unit_price,
-            total_price=total
-        ))
-
-        # decrement stock
-        product.stock_quantity -= item.quantity
-        if product.stock_quantity <= LOW_STOCK_THRESHOLD:
-            # notify admin in background
-            background.add_task(send_email_smtp,
-                                to_email="admin@tayyab.com",
-                                subject="Low stock alert",
-                                body=f"Product {product.name} low: {product.stock_quantity} left.")
+        item_rows.append({
+            "product_id": item.product_id,
+            "quantity": item.quantity,
+            "unit_price": unit_price,
+            "total_price": total
+        })
+
+    levels = []
+    for product_id, quantity in wanted.items():
+        product = products[product_id]
+        levels.append((product_id, product.name, product.stock_quantity, product.stock_quantity - quantity))
+        product.stock_quantity -= quantity
 
     # apply simple loyalty discount if any (optional)
     # order_count = db.query(Order).filter(Order.user_id == user.id).count()
@@ -64,40 +147,74 @@ def create_order(order_in: OrderCreate, background: BackgroundTasks, db: Session
         user_id=order_in.user_id,
         delivery_address=order_in.delivery_address,
         delivery_region=order_in.delivery_region,
-        total_price=total_price,
-        items=order_items
+        total_price=total_price
     )
     db.add(order)
+    db.flush()
+    # one multi-row INSERT for all lines instead of one per item
+    db.execute(insert(OrderItem), [{"order_id": order.id, **row} for row in item_rows])
+    stock_ledger.record_many(db, [
+        {"product_id": product_id, "delta": -quantity, "reason": stock_ledger.ORDER, "reference_id": order.id}
+        for product_id, quantity in wanted.items()
+    ])
+    # delivered by the outbox dispatcher once this commits
+    outbox.enqueue(db, "email", to_email=user.email, subject="Order Confirmed",
+                   body=f"Your order #{order.id} is received. Total: {order.total_price}")
+    result = OrderOut.model_validate(order)
+    idempotency.complete(claim, result)
+    mark_changed(db, wanted)
     db.commit()
-    db.refresh(order)
-
-    # send order confirmation email in background
-    background.add_task(send_email_smtp, user.email, "Order Confirmed", f"Your order #{order.id} is received. Total: {order.total_price}")
+    # collected into one low-stock digest per window
+    for level in levels:
+        low_stock_alerts.note_crossing(*level)
 
-    return order
-    with log_exceptions("Create order"):
-        # your existing order creation logic
-        pass
+    return result
 
 
-@router.put("/orders/{order_id}/status")
+@router.put("/orders/{order_id}/status", response_model=OrderOut)
 def update_order_status(
         order_id: int,
-        new_status: str,
+        new_status: OrderStatus,
         db: Session = Depends(get_db),
         admin=Depends(require_admin)
 ):
-    order = db.query(Order).filter(Order.id == order_id).first()
-    if not order:
-        raise HTTPException(404, "Order not found")
-
-    old_status = order.status
-    order.status = new_status
+    moved, rejected, restocked = order_status.transition(db, [order_id], new_status)
+    if not moved:
+        db.rollback()
+        if order_id not in rejected:
+            raise HTTPException(404, "Order not found")
+        raise HTTPException(409, f"Cannot change order status from {rejected[order_id]} to {new_status.value}")
+    # status emails commit with the change and are sent by the outbox dispatcher
+    order_status.notify(db, moved, new_status)
+    mark_changed(db, restocked)
     db.commit()
 
-    # Send notification
-    user_email = order.user.email
-    asyncio.create_task(send_order_status_email(user_email, order_id, new_status))
+    logger.info(f"Order {order_id} status changed to {new_status.value}")
+    return db.query(Order).filter(Order.id == order_id).first()
+
+
+@router.post("/status/bulk")
+def bulk_update_order_status(
+        payload: OrderStatusBulkUpdate,
+        db: Session = Depends(get_db),
+        admin=Depends(require_admin)
+):
+    """
+    Move many orders to one status at once (e.g. a day's dispatch)
+
+    - Orders that can't make the transition are skipped and reported with their current status
+    - Admin authorization required
+    """
+    moved, rejected, restocked = order_status.transition(db, payload.order_ids, payload.status)
+    order_status.notify(db, moved, payload.status)
+    mark_changed(db, restocked)
+    db.commit()
 
-    logger.info(f"Order {order_id} status changed: {old_status} -> {new_status}")
-    return order
+    found = set(moved) | set(rejected)
+    logger.info(f"Bulk status change to {payload.status.value}: {len(moved)} moved, {len(rejected)} skipped")
+    return {
+        "status": payload.status,
+        "updated": moved,
+        "skipped": [{"order_id": order_id, "current_status": status} for order_id, status in rejected.items()],
+        "not_found": sorted(set(payload.order_ids) - found),
+    }
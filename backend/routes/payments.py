@@ -1,9 +1,10 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Header, Response
 from sqlalchemy.orm import Session
 from backend.database import get_db
 from backend.models import Payment, Order
 from backend.schemas import PaymentMethod, PaymentStatus, PaymentCreate, PaymentOut
+from backend.services import idempotency, outbox
 from datetime import datetime
 
 router = APIRouter(prefix="/payments", tags=["payments"])
@@ -19,7 +20,16 @@ PAKISTAN_BANKS = {
 }
 
 @router.post("/", response_model=PaymentOut)
-def make_payment(payment_in: PaymentCreate, db: Session = Depends(get_db)):
+def make_payment(
+    payment_in: PaymentCreate,
+    db: Session = Depends(get_db),
+    idempotency_key: Optional[str] = Header(None),
+):
+    # a retried request with the same Idempotency-Key gets the original payment back
+    claim = idempotency.claim(db, f"payments:{payment_in.order_id}", idempotency_key, payment_in)
+    if isinstance(claim, Response):
+        return claim
+
     # Validate order exists and get order details
     order = db.query(Order).filter(Order.id == payment_in.order_id).first()
     if not order:
@@ -31,14 +41,27 @@ def make_payment(payment_in: PaymentCreate, db: Session = Depends(get_db)):
 
     # Process payment based on method
     if payment_in.method == PaymentMethod.BANK_TRANSFER:
-        return process_bank_transfer(payment_in, order, db)
+        payment = process_bank_transfer(payment_in, order, db)
     elif payment_in.method in [PaymentMethod.JAZZ_CASH, PaymentMethod.EASYPAISA]:
-        return process_mobile_wallet(payment_in, order, db)
+        payment = process_mobile_wallet(payment_in, order, db)
     elif payment_in.method in [PaymentMethod.STRIPE, PaymentMethod.PAYPAL]:
-        return process_international_payment(payment_in, order, db)
+        payment = process_international_payment(payment_in, order, db)
     else:
         raise HTTPException(status_code=400, detail="Unsupported payment method")
 
+    if payment.status == PaymentStatus.PAID:
+        _queue_payment_email(db, order, payment)
+
+    # payment, order status, receipt email and stored response commit together
+    result = PaymentOut.model_validate(payment)
+    idempotency.complete(claim, result)
+    db.commit()
+    return result
+
+def _queue_payment_email(db: Session, order: Order, payment: Payment):
+    outbox.enqueue(db, "email", to_email=order.user.email, subject=f"Payment received - Order #{order.id}",
+                   body=f"We have received your payment of {payment.amount} {payment.currency} for order #{order.id}.")
+
 def process_bank_transfer(payment_in: PaymentCreate, order: Order, db: Session):
     """Process bank transfer payment"""
     if not payment_in.bank_name or not payment_in.transaction_id:
@@ -61,8 +84,7 @@ def process_bank_transfer(payment_in: PaymentCreate, order: Order, db: Session):
     )
 
     db.add(payment)
-    db.commit()
-    db.refresh(payment)
+    db.flush()
 
     return payment
 
@@ -79,12 +101,10 @@ def process_mobile_wallet(payment_in: PaymentCreate, order: Order, db: Session):
     )
 
     db.add(payment)
-    db.commit()
-    db.refresh(payment)
 
     # Update order status
     order.status = "paid"
-    db.commit()
+    db.flush()
 
     return payment
 
@@ -104,12 +124,10 @@ def process_international_payment(payment_in: PaymentCreate, order: Order, db: S
     )
 
     db.add(payment)
-    db.commit()
-    db.refresh(payment)
 
     # Update order status
     order.status = "paid"
-    db.commit()
+    db.flush()
 
     return payment
 
@@ -126,6 +144,7 @@ def verify_bank_transfer(payment_id: int, db: Session = Depends(get_db)):
     # Update order status
     order = db.query(Order).filter(Order.id == payment.order_id).first()
     order.status = "paid"
+    _queue_payment_email(db, order, payment)
 
     db.commit()
     db.refresh(payment)
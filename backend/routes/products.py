@@ -1,62 +1,180 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Query
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, UploadFile, File, Query, Request, Response
+from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
 from backend.database import get_db
 from backend.models import Product
-from backend.schemas import ProductCreate, ProductOut, ProductFilter
+from backend.schemas import ProductCreate, ProductOut, ProductFilter, ProductFacets
+from backend.reprossitories import product_repo
+from backend.services.search import ATTRIBUTES, search_index
+from backend.services import facets as facet_service
+from backend.services import catalog, stock_ledger
+from backend.services.images import ALLOWED_EXTENSIONS, generate_variants_job, save_upload
+from backend.services.product_import import import_products, iter_rows
+from starlette.concurrency import run_in_threadpool
+from backend.utils.pagination import encode_cursor, decode_cursor
 from backend.security import require_admin
-from backend.services.cache import cache_response
-import os, shutil
 
-UPLOAD_DIR = "uploads/products"
-os.makedirs(UPLOAD_DIR, exist_ok=True)
+MAX_SEARCH_HITS = 1000  # relevance-ranked candidates a search pages, sorts and counts facets over
+MAX_BULK_IDS = 100
 
 router = APIRouter(prefix="/products", tags=["products"])
 
 
+def _not_modified(request: Request, response: Response, *etag_parts) -> Response | None:
+    """
+    Answer 304 straight from the catalog version when the client's copy is
+    current, before any query or serialisation; otherwise tag the response.
+    """
+    etag = catalog.make_etag(*etag_parts)
+    if catalog.etag_matches(request, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    return None
+
+
+def _paginate(q, sort: str, cursor: str | None, skip: int, limit: int, response: Response):
+    """
+    Keyset pagination over a product query. With a cursor the page is found by
+    an index seek on (sort column, id); without one `skip` is still honoured
+    for old clients. The next page's cursor is returned in X-Next-Cursor.
+    """
+    try:
+        q = product_repo.apply_keyset(q, sort, cursor)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+    if not cursor and skip:
+        q = q.offset(skip)
+    rows = q.limit(limit).all()
+
+    token = product_repo.next_cursor(rows, sort, limit)
+    if token:
+        response.headers["X-Next-Cursor"] = token
+    return rows
+
+
 @router.get("/", response_model=list[ProductOut])
 def list_products(
+    request: Request,
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=100),
+    cursor: str | None = None,
+    sort: str = "newest",
+    ids: str | None = Query(None, description="Comma-separated product ids; served from the detail cache"),
     db: Session = Depends(get_db)
 ):
-    return db.query(Product).offset(skip).limit(limit).all()
+    not_modified = _not_modified(request, response, "list", catalog.catalog_version(db),
+                                 sorted(request.query_params.multi_items()))
+    if not_modified:
+        return not_modified
+
+    if ids is not None:
+        try:
+            wanted = list(dict.fromkeys(int(pid) for pid in ids.split(",") if pid.strip()))
+        except ValueError:
+            raise HTTPException(400, "ids must be a comma-separated list of integers")
+        if len(wanted) > MAX_BULK_IDS:
+            raise HTTPException(400, f"At most {MAX_BULK_IDS} ids per request")
+        payloads = catalog.product_payloads(db, wanted)
+        return JSONResponse([payloads[pid] for pid in wanted if pid in payloads], headers={"ETag": response.headers["ETag"]})
+
+    return _paginate(db.query(Product), sort, cursor, skip, limit, response)
+
+
+def _search_candidates(db: Session, query: str, filters: ProductFilter) -> list[int]:
+    """
+    Product ids matching the query, best match first. Hits are narrowed by
+    metal, karat and category inside the index and only then cut to
+    MAX_SEARCH_HITS, so search pages, explicit sorts and facet counts all
+    work over this one bounded set; SQL applies the remaining filters to it.
+    """
+    search_index.ensure_loaded(db)
+    where = {name: getattr(filters, name) for name in ATTRIBUTES}
+    return [pid for pid, _ in search_index.search(query, limit=MAX_SEARCH_HITS, where=where)]
+
+
+def _relevance_page(q, ranked_ids: list[int], cursor: str | None, skip: int, limit: int, response: Response):
+    """
+    Page through search hits in relevance order. Filters are applied in SQL
+    over the candidate ids (ids only), then just the requested page is loaded.
+    """
+    if cursor:
+        try:
+            (skip,) = decode_cursor(cursor, "relevance", 1)
+            if not isinstance(skip, int) or skip < 0:
+                raise ValueError("Malformed cursor")
+        except ValueError as e:
+            raise HTTPException(400, str(e))
+    matching = {pid for (pid,) in q.filter(Product.id.in_(ranked_ids)).with_entities(Product.id)}
+    page_ids = [pid for pid in ranked_ids if pid in matching][skip:skip + limit + 1]
+
+    if len(page_ids) > limit:
+        page_ids = page_ids[:limit]
+        response.headers["X-Next-Cursor"] = encode_cursor("relevance", skip + limit)
+    rows = {p.id: p for p in q.session.query(Product).filter(Product.id.in_(page_ids))}
+    return [rows[pid] for pid in page_ids if pid in rows]
 
 
 @router.get("/search", response_model=list[ProductOut])
 def search_products(
+    request: Request,
+    response: Response,
     query: str = None,
     filters: ProductFilter = Depends(),
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=100),
+    cursor: str | None = None,
+    sort: str | None = None,
     db: Session = Depends(get_db)
 ):
-    q = db.query(Product)
-    if query:
-        q = q.filter(
-            Product.name.ilike(f"%{query}%") |
-            Product.description.ilike(f"%{query}%")
-        )
-    if filters.min_price:
-        q = q.filter(Product.price >= filters.min_price)
-    if filters.max_price:
-        q = q.filter(Product.price <= filters.max_price)
-    if filters.metal_type:
-        q = q.filter(Product.metal_type == filters.metal_type)
-    if filters.karat:
-        q = q.filter(Product.karat == filters.karat)
-    if filters.category:
-        q = q.filter(Product.category == filters.category)
-    if filters.in_stock:
-        q = q.filter(Product.stock_quantity > 0)
-    return q.offset(skip).limit(limit).all()
+    """
+    Full-text search over name, description, category and metal with prefix
+    matching and one-typo tolerance. Results are ranked by relevance unless an
+    explicit sort is requested; either way they come from the MAX_SEARCH_HITS
+    best matches for the query and filters.
+    """
+    not_modified = _not_modified(request, response, "search", catalog.catalog_version(db),
+                                 sorted(request.query_params.multi_items()))
+    if not_modified:
+        return not_modified
+
+    q = product_repo.apply_filters(db.query(Product), filters)
+    if not query:
+        return _paginate(q, sort or "newest", cursor, skip, limit, response)
+
+    ranked_ids = _search_candidates(db, query, filters)
+    if not ranked_ids:
+        return []
+    if sort and sort != "relevance":
+        return _paginate(q.filter(Product.id.in_(ranked_ids)), sort, cursor, skip, limit, response)
+    return _relevance_page(q, ranked_ids, cursor, skip, limit, response)
+
+
+@router.get("/facets", response_model=ProductFacets)
+def product_facets(
+    query: str = None,
+    filters: ProductFilter = Depends(),
+    db: Session = Depends(get_db)
+):
+    """Facet counts for the same query and filters accepted by /products/search."""
+    def compute():
+        # the same candidate set /products/search pages through
+        product_ids = _search_candidates(db, query, filters) if query else None
+        return facet_service.compute_facets(db, filters, product_ids)
+
+    signature = facet_service.facet_signature(catalog.catalog_version(db), query, filters)
+    return facet_service.facet_cache.get_or_compute(signature, compute)
 
 
 @router.get("/{product_id}", response_model=ProductOut)
-def get_product(product_id: int, db: Session = Depends(get_db)):
-    product = db.query(Product).filter(Product.id == product_id).first()
-    if not product:
+def get_product(product_id: int, request: Request, response: Response, db: Session = Depends(get_db)):
+    not_modified = _not_modified(request, response, "product", product_id, catalog.product_version(db, product_id))
+    if not_modified:
+        return not_modified
+    payload = catalog.product_payloads(db, [product_id]).get(product_id)
+    if payload is None:
         raise HTTPException(status_code=404, detail="Product not found")
-    return product
+    return JSONResponse(payload, headers={"ETag": response.headers["ETag"]})
 
 
 @router.post("/", response_model=ProductOut)
@@ -67,29 +185,59 @@ def create_product(
 ):
     product = Product(**prod_in.dict())
     db.add(product)
+    db.flush()
+    if product.stock_quantity:
+        stock_ledger.record(db, product.id, product.stock_quantity, stock_ledger.INITIAL)
+    catalog.mark_changed(db, [product.id])
     db.commit()
     db.refresh(product)
+    search_index.upsert(product)
     return product
 
 
+@router.post("/import")
+def bulk_import_products(
+    file: UploadFile = File(...),
+    batch_size: int = Query(500, ge=1, le=5000),
+    admin=Depends(require_admin),
+    db: Session = Depends(get_db)
+):
+    """
+    Bulk upsert products from a CSV or NDJSON upload (one ProductCreate per
+    row, matched on sku). Rows are streamed and written in batches, each in
+    its own transaction; the report lists every rejected row.
+    """
+    ext = (file.filename or "").rsplit(".", 1)[-1].lower()
+    if ext == "csv":
+        fmt = "csv"
+    elif ext in ("ndjson", "jsonl"):
+        fmt = "ndjson"
+    else:
+        raise HTTPException(400, "Upload a .csv or .ndjson file")
+    return import_products(db, iter_rows(file.file, fmt), batch_size)
+
+
 @router.post("/upload-image/{product_id}")
 async def upload_product_image(
     product_id: int,
+    background: BackgroundTasks,
     file: UploadFile = File(...),
     admin=Depends(require_admin),
     db: Session = Depends(get_db)
 ):
     ext = file.filename.rsplit(".", 1)[-1].lower()
-    if ext not in ("jpg", "jpeg", "png", "webp"):
+    if ext not in ALLOWED_EXTENSIONS:
         raise HTTPException(400, "Invalid file type")
-    filename = f"{product_id}.{ext}"
-    path = os.path.join(UPLOAD_DIR, filename)
-    with open(path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
-    product = db.query(Product).filter(Product.id == product_id).first()
+    product = await run_in_threadpool(db.get, Product, product_id)
     if not product:
         raise HTTPException(404, "Product not found")
+
+    filename = await save_upload(file, ext)
     product.images = filename
-    db.commit()
-    db.refresh(product)
+    product.image_variants = {"original": filename}
+    await run_in_threadpool(catalog.mark_changed, db, [product_id])
+    await run_in_threadpool(db.commit)
+
+    # thumbnail / medium / webp are rendered in a worker process after the response
+    background.add_task(generate_variants_job, product_id, filename)
     return {"url": f"/uploads/products/{filename}", "filename": filename}
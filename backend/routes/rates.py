@@ -1,66 +1,59 @@
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import datetime
+from typing import Literal, Optional
+
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.orm import Session
 from backend.database import get_db
 from backend.models import GoldRate
-from backend.schemas import GoldRateOut, GoldRateCreate
-from backend.utils.scraper import scrape_gold_prices
-from backend.utils.calculation import price_per_gram_from_tola, karat_price_from_24k_tola
-import time
+from backend.schemas import GoldRateOut, GoldRateCreate, GoldRateCandle
+from backend.utils.calculation import price_per_gram_from_tola
+from backend.services import rate_rollups
+from backend.services.gold_rates import rate_refresher
+from backend.services.pricing import reprice_catalog_job
+from backend.services.catalog import etag_matches
 
 router = APIRouter(prefix="/rates", tags=["rates"])
 
-# Simple in-memory cache
-_cache = {"value": None, "ts": 0}
-CACHE_TTL = 60  # seconds
-
 
 @router.get("/latest", response_model=list[GoldRateOut])
-def latest_rates(db: Session = Depends(get_db)):
-
-    # 1. Check cache
-    if _cache["value"] and time.time() - _cache["ts"] < CACHE_TTL:
-        return _cache["value"]
-
-    # 2. Scrape live prices
-    prices = scrape_gold_prices()   # FIXED NAME
-    if not prices:
-        # If scraping fails → fallback to DB
-        rows = db.query(GoldRate).order_by(GoldRate.created_at.desc()).limit(6).all()
-        if not rows:
-            raise HTTPException(500, "No rate available")
-        _cache["value"] = rows
-        _cache["ts"] = time.time()
-        return rows
-
-    # 3. Build rate list using scraped data
-    rates = []
-    for karat in [24, 22, 21, 18, 12, 10]:
-
-        # Convert from 24K price → selected karat
-        tola_price = karat_price_from_24k_tola(prices, karat)  # FIXED
-
-        gram_price = price_per_gram_from_tola(tola_price)
-
-        gr = GoldRate(
-            karat=karat,
-            price_per_tola=tola_price,
-            price_per_gram=gram_price,
-            source="live"
-        )
-        db.add(gr)
-        rates.append(gr)
-
-    db.commit()
-
-    # Update cache
-    _cache["value"] = rates
-    _cache["ts"] = time.time()
-
-    return rates
+def latest_rates(request: Request, db: Session = Depends(get_db)):
+    # pre-serialised snapshot kept fresh in the background; stale copies are
+    # served while a single refresh runs, so no request waits on the source
+    snapshot = rate_refresher.current(db)
+    if snapshot is None:
+        raise HTTPException(503, "No rate available")
+    if etag_matches(request, snapshot.etag):
+        return Response(status_code=304, headers={"ETag": snapshot.etag})
+    return Response(content=snapshot.body, media_type="application/json", headers={"ETag": snapshot.etag})
+
+
+@router.get("/series", response_model=list[GoldRateCandle])
+def rate_series(
+    karat: int = 24,
+    resolution: Literal["minute", "hour", "day"] = "hour",
+    from_: Optional[datetime] = Query(None, alias="from"),
+    to: Optional[datetime] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    Open/high/low/close per tola for charts, read from the rollups rather
+    than raw ticks. Rates are stored only when they change, so a missing
+    bucket means the price held at the previous close. Without `from` the
+    window defaults to a day of minutes, a month of hours or a year of days.
+    """
+    to = to or datetime.utcnow()
+    from_ = from_ or to - rate_rollups.DEFAULT_SPAN[resolution]
+    if from_ >= to:
+        raise HTTPException(400, "`from` must be before `to`")
+    buckets = rate_rollups.series(db, karat, resolution, from_, to)
+    return [
+        {"time": b.bucket_start, "open": b.open, "high": b.high, "low": b.low, "close": b.close, "ticks": b.tick_count}
+        for b in buckets
+    ]
 
 
 @router.post("/manual", response_model=list[GoldRateOut])
-def manual_insert(rate_in: GoldRateCreate, db: Session = Depends(get_db)):
+def manual_insert(rate_in: GoldRateCreate, background: BackgroundTasks, db: Session = Depends(get_db)):
 
     gram = price_per_gram_from_tola(rate_in.price_per_tola)
 
@@ -71,7 +64,11 @@ def manual_insert(rate_in: GoldRateCreate, db: Session = Depends(get_db)):
         source=rate_in.source
     )
     db.add(obj)
+    db.flush()
+    rate_rollups.fold(db, [obj], rate_rollups.RESOLUTIONS)
     db.commit()
     db.refresh(obj)
+    rate_refresher.load_from_db(db)
+    background.add_task(reprice_catalog_job)
 
     return [obj]
@@ -2,7 +2,7 @@
 from datetime import datetime, date
 from enum import Enum
 from typing import Optional, List
-from pydantic import BaseModel, EmailStr, Field
+from pydantic import BaseModel, EmailStr, Field, model_validator
 from pydantic import ConfigDict
 
 # --- Payment Enums ---
@@ -21,6 +21,15 @@ class PaymentStatus(str, Enum):
     CANCELLED = "cancelled"
     REFUNDED = "refunded"
 
+class OrderStatus(str, Enum):
+    PENDING = "pending"
+    PAID = "paid"
+    PROCESSING = "processing"
+    SHIPPED = "shipped"
+    DELIVERED = "delivered"
+    COMPLETED = "completed"
+    CANCELLED = "cancelled"
+
 # --- Users ---
 class UserCreate(BaseModel):
     name: str
@@ -49,10 +58,25 @@ class ProductCreate(BaseModel):
     stock_quantity: int
     description: Optional[str] = None
     price: Optional[float] = 0.0
+    sku: Optional[str] = None
+
+class ProductUpdate(BaseModel):
+    name: Optional[str] = None
+    metal_type: Optional[str] = None
+    category: Optional[str] = None
+    karat: Optional[int] = None
+    weight_grams: Optional[float] = None
+    making_charge: Optional[float] = None
+    stock_quantity: Optional[int] = None
+    description: Optional[str] = None
+    price: Optional[float] = None
+    sku: Optional[str] = None
 
 class ProductOut(ProductCreate):
     id: int
     images: Optional[str] = None
+    image_variants: Optional[dict[str, str]] = None
+    available_quantity: Optional[int] = None
     created_at: datetime
 
     model_config = ConfigDict(from_attributes=True)
@@ -76,6 +100,23 @@ class OrderCreate(BaseModel):
     items: List[OrderItemCreate]
     delivery_address: Optional[str] = None
     delivery_region: Optional[str] = None
+    quote_token: Optional[str] = None  # from POST /orders/quote; locks the quoted prices
+
+class QuoteRequest(BaseModel):
+    user_id: int
+    items: List[OrderItemCreate] = Field(..., min_length=1)
+
+class QuoteItem(BaseModel):
+    product_id: int
+    quantity: int
+    unit_price: float
+    total_price: float
+
+class QuoteOut(BaseModel):
+    quote_token: str
+    expires_at: datetime
+    total_price: float
+    items: List[QuoteItem]
 
 class OrderOut(BaseModel):
     id: int
@@ -89,6 +130,19 @@ class OrderOut(BaseModel):
 
     model_config = ConfigDict(from_attributes=True)
 
+class OrderStatusBulkUpdate(BaseModel):
+    order_ids: List[int] = Field(..., min_length=1, max_length=1000)
+    status: OrderStatus
+
+class OrderSummary(BaseModel):
+    id: int
+    status: str
+    total_price: float
+    delivery_region: Optional[str]
+    placed_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
 # --- Token ---
 class Token(BaseModel):
     access_token: str
@@ -129,6 +183,14 @@ class GoldRateCreate(BaseModel):
     price_per_tola: float
     source: Optional[str] = "manual"
 
+class GoldRateCandle(BaseModel):
+    time: datetime
+    open: float
+    high: float
+    low: float
+    close: float
+    ticks: int
+
 class GoldRateOut(BaseModel):
     id: int
     karat: int
@@ -175,6 +237,37 @@ class ProductFilter(BaseModel):
     category: Optional[str] = None
     in_stock: Optional[bool] = None
 
+class StockMovementOut(BaseModel):
+    id: int
+    delta: int
+    reason: str
+    reference_id: Optional[int]
+    created_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
+class StockAdjustment(BaseModel):
+    product_id: int
+    delta: Optional[int] = None   # relative change
+    count: Optional[int] = Field(None, ge=0)  # absolute on-hand count from a stock-take
+
+    @model_validator(mode="after")
+    def one_of_delta_or_count(self):
+        if (self.delta is None) == (self.count is None):
+            raise ValueError("Give exactly one of delta or count")
+        return self
+
+class StockBulkAdjust(BaseModel):
+    items: List[StockAdjustment] = Field(..., min_length=1, max_length=10000)
+
+class ProductFacets(BaseModel):
+    total: int
+    metal_type: dict[str, int]
+    karat: dict[str, int]
+    category: dict[str, int]
+    price: dict[str, int]
+    in_stock: dict[str, int]
+
 class UserProfileBase(BaseModel):
     phone: Optional[str] = None
     dob: Optional[date] = None
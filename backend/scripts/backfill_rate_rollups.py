@@ -0,0 +1,30 @@
+"""
+One-off: fold every gold_rates row already in the database into the
+minute/hour/day rollups, then drop buckets past their retention. New rates
+are folded on arrival; run this once after deploying rollups so history and
+/history/analysis/trends cover the rows stored before them. Safe to re-run.
+
+    python -m backend.scripts.backfill_rate_rollups
+"""
+import time
+from datetime import datetime
+
+from backend.database import Base, SessionLocal, engine
+from backend.services import rate_rollups
+
+
+def main():
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        folded = rate_rollups.backfill(db)
+        pruned = rate_rollups.prune_rollups(db, datetime.utcnow())
+    finally:
+        db.close()
+    print(f"Folded {folded} gold rate rows into rollups in {time.perf_counter() - started:.1f}s, "
+          f"pruned {pruned} buckets past retention")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Hammer a single product with concurrent checkouts and check for oversells.
+
+    python -m backend.scripts.bench_order_concurrency --url mysql+pymysql://... --clients 200 --stock 50
+
+--url is required and must point at a scratch MySQL database, never the
+shop's own: row locks (SELECT ... FOR UPDATE) are what is being measured, so
+SQLite results say nothing about them. The bench user, product, orders and
+their queued confirmation emails are deleted afterwards (the catalog version
+bumps stay; versions only ever move forward). Exits non-zero on an oversell,
+on any unexpected error, or if nothing was sold at all.
+"""
+import argparse
+import threading
+import time
+
+from fastapi import HTTPException
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from backend.database import Base
+from backend.models import Order, OrderItem, OutboxMessage, Product, StockMovement, User
+from backend.routes.orders import create_order
+from backend.schemas import OrderCreate, OrderItemCreate
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", required=True, help="scratch database URL")
+    parser.add_argument("--clients", type=int, default=200)
+    parser.add_argument("--stock", type=int, default=50)
+    args = parser.parse_args()
+
+    engine = create_engine(args.url, pool_size=args.clients, max_overflow=0, pool_pre_ping=True)
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine, autoflush=False)
+
+    setup = Session()
+    email = f"bench-{time.time_ns()}@example.com"
+    user = User(name="bench", email=email, hashed_password="x")
+    product = Product(name="Bench piece", metal_type="gold", karat=22, weight_grams=1,
+                      price=1000, stock_quantity=args.stock)
+    setup.add_all([user, product])
+    setup.commit()
+    user_id, product_id = user.id, product.id
+    first_outbox_id = (setup.query(OutboxMessage.id).order_by(OutboxMessage.id.desc()).limit(1).scalar() or 0) + 1
+    setup.close()
+
+    results = {"sold": 0, "rejected": 0, "errors": 0}
+    lock = threading.Lock()
+    start = threading.Barrier(args.clients)
+    order_in = OrderCreate(user_id=user_id, items=[OrderItemCreate(product_id=product_id, quantity=1)])
+
+    def client():
+        db = Session()
+        start.wait()
+        try:
+            create_order(order_in, db, idempotency_key=None)
+            outcome = "sold"
+        except HTTPException:
+            outcome = "rejected"
+        except Exception:
+            outcome = "errors"
+        finally:
+            db.close()
+        with lock:
+            results[outcome] += 1
+
+    threads = [threading.Thread(target=client) for _ in range(args.clients)]
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - t0
+
+    check = Session()
+    remaining = check.get(Product, product_id).stock_quantity
+    sold_units = sum(
+        q for (q,) in check.query(OrderItem.quantity).filter(OrderItem.product_id == product_id)
+    )
+    oversold = max(0, sold_units - args.stock)
+
+    print(f"clients={args.clients} stock={args.stock} elapsed={elapsed:.2f}s "
+          f"throughput={args.clients / elapsed:.0f} checkouts/s")
+    print(f"sold={results['sold']} rejected={results['rejected']} errors={results['errors']} "
+          f"remaining_stock={remaining} units_in_orders={sold_units} oversold={oversold}")
+
+    order_ids = [oid for (oid,) in check.query(Order.id).filter(Order.user_id == user_id)]
+    check.query(OrderItem).filter(OrderItem.order_id.in_(order_ids)).delete(synchronize_session=False)
+    check.query(Order).filter(Order.user_id == user_id).delete(synchronize_session=False)
+    # "Order Confirmed" emails the dispatcher would otherwise send to the bench address
+    outbox_ids = [
+        message.id for message in check.query(OutboxMessage).filter(OutboxMessage.id >= first_outbox_id)
+        if message.payload.get("to_email") == email
+    ]
+    check.query(OutboxMessage).filter(OutboxMessage.id.in_(outbox_ids)).delete(synchronize_session=False)
+    check.query(StockMovement).filter(StockMovement.product_id == product_id).delete(synchronize_session=False)
+    check.query(Product).filter(Product.id == product_id).delete(synchronize_session=False)
+    check.query(User).filter(User.id == user_id).delete(synchronize_session=False)
+    check.commit()
+    check.close()
+
+    if oversold or remaining < 0:
+        raise SystemExit("OVERSOLD")
+    if results["errors"]:
+        raise SystemExit(f"{results['errors']} checkouts failed unexpectedly")
+    if not results["sold"]:
+        raise SystemExit("No checkout succeeded")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Offset vs keyset pagination on a large seeded catalog.
+
+    python -m backend.scripts.bench_product_pagination --rows 1000000 --page 5000
+
+Seeds into its own database (--url, SQLite file by default) so it never
+touches the shop's real tables.
+"""
+import argparse
+import statistics
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from backend.database import Base
+from backend.models import Product
+from backend.reprossitories import product_repo
+
+
+def seed(session, rows: int, chunk: int = 20000):
+    start = datetime(2020, 1, 1)
+    for lo in range(0, rows, chunk):
+        session.execute(insert(Product.__table__), [
+            {
+                "name": f"Product {i}",
+                "metal_type": "gold",
+                "category": "ready made",
+                "karat": 22,
+                "weight_grams": 5.0,
+                "price": 100000 + (i * 7919) % 900000,
+                "making_charge": 0.0,
+                "stock_quantity": i % 5,
+                "created_at": start + timedelta(seconds=i),
+            }
+            for i in range(lo, min(lo + chunk, rows))
+        ])
+        session.commit()
+
+
+def timed(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    return statistics.median(samples) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default="sqlite:///bench_products.db")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--page", type=int, default=5000)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--sort", default="newest", choices=sorted(product_repo.PRODUCT_SORTS))
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    engine = create_engine(args.url)
+    Base.metadata.create_all(bind=engine, tables=[Product.__table__])
+    session = sessionmaker(bind=engine)()
+
+    if session.query(Product).count() < args.rows:
+        t0 = time.perf_counter()
+        seed(session, args.rows)
+        print(f"seeded {args.rows} rows in {time.perf_counter() - t0:.1f}s")
+
+    def offset_page(page):
+        q = product_repo.apply_keyset(session.query(Product), args.sort)
+        return q.offset((page - 1) * args.limit).limit(args.limit).all()
+
+    def keyset_page(cursor):
+        return product_repo.apply_keyset(session.query(Product), args.sort, cursor).limit(args.limit).all()
+
+    # cursor pointing at the end of page-1, fetched outside the timed section
+    previous = offset_page(args.page - 1)
+    deep_cursor = product_repo.next_cursor(previous, args.sort, args.limit)
+
+    results = {
+        "offset page 1": timed(lambda: offset_page(1), args.repeat),
+        f"offset page {args.page}": timed(lambda: offset_page(args.page), args.repeat),
+        "keyset page 1": timed(lambda: keyset_page(None), args.repeat),
+        f"keyset page {args.page}": timed(lambda: keyset_page(deep_cursor), args.repeat),
+    }
+    assert [p.id for p in keyset_page(deep_cursor)] == [p.id for p in offset_page(args.page)]
+
+    for name, ms in results.items():
+        print(f"{name:<24} {ms:8.2f} ms")
+    session.close()
+
+
+if __name__ == "__main__":
+    main()
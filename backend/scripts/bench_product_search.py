@@ -0,0 +1,72 @@
+"""
+Latency of the in-process product search index on a synthetic catalog,
+next to a substring scan that mimics the old ILIKE '%q%' filter.
+
+    python -m backend.scripts.bench_product_search --products 100000
+"""
+import argparse
+import random
+import statistics
+import time
+from types import SimpleNamespace
+
+from backend.services.search import ProductSearchIndex, _document
+
+ITEMS = ["ring", "necklace", "bangle", "bracelet", "earrings", "pendant", "chain", "locket", "anklet", "set"]
+STYLES = ["bridal", "classic", "antique", "kundan", "polki", "minimal", "turkish", "italian", "floral", "royal"]
+METALS = ["gold", "silver", "platinum"]
+CATEGORIES = ["ready made", "bridal", "custom", "gents", "kids"]
+QUERIES = ["necklace", "bridal set", "neck", "kund", "neckalce", "braclet", "gold ring", "antique gold chain"]
+
+
+def catalog(size: int, seed: int = 7):
+    rnd = random.Random(seed)
+    for pid in range(1, size + 1):
+        style, item = rnd.choice(STYLES), rnd.choice(ITEMS)
+        yield SimpleNamespace(
+            id=pid,
+            name=f"{style.title()} {rnd.choice([18, 21, 22, 24])}K {item.title()} {pid}",
+            description=f"{rnd.choice(STYLES)} {item} crafted by hand, {rnd.randint(2, 40)} grams",
+            category=rnd.choice(CATEGORIES),
+            metal_type=rnd.choice(METALS),
+        )
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--products", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    docs = list(catalog(args.products))
+    index = ProductSearchIndex()
+    t0 = time.perf_counter()
+    for doc in docs:
+        index._add(doc.id, *_document(doc))
+    index._loaded = True
+    print(f"indexed {args.products} products in {time.perf_counter() - t0:.2f}s")
+
+    print(f"{'query':<22}{'hits':>8}{'p50 ms':>10}{'p99 ms':>10}{'scan ms':>10}")
+    for query in QUERIES:
+        samples = []
+        for _ in range(args.repeat):
+            t0 = time.perf_counter()
+            hits = index.search(query, limit=1000)
+            samples.append((time.perf_counter() - t0) * 1000)
+
+        needle = query.lower()
+        t0 = time.perf_counter()
+        [d.id for d in docs if needle in d.name.lower() or needle in d.description.lower()]
+        scan_ms = (time.perf_counter() - t0) * 1000
+
+        print(f"{query:<22}{len(hits):>8}{statistics.median(samples):>10.2f}"
+              f"{percentile(samples, 0.99):>10.2f}{scan_ms:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
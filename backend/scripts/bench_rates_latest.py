@@ -0,0 +1,112 @@
+"""
+Hammer /rates/latest across several cache expiries with a deliberately slow
+rate source and report latency percentiles, split into requests that landed
+right after an expiry and the rest. With stale-while-revalidate both groups
+should look the same, and the source should be hit about once per expiry.
+
+    python -m backend.scripts.bench_rates_latest --seconds 10 --ttl 1 --fetch-ms 500
+
+Uses its own database (--url, SQLite file by default).
+"""
+import argparse
+import statistics
+import threading
+import time
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from backend.database import Base, get_db
+from backend.models import GoldRate, GoldRateRollup
+from backend.routes import rates
+from backend.services.gold_rates import rate_refresher
+
+
+def percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default="sqlite:///bench_rates.db")
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--ttl", type=float, default=1.0)
+    parser.add_argument("--fetch-ms", type=float, default=500)
+    parser.add_argument("--clients", type=int, default=16)
+    args = parser.parse_args()
+
+    engine = create_engine(args.url, connect_args={"check_same_thread": False} if args.url.startswith("sqlite") else {})
+    # each refresh stores the ticks and folds them into the rollups
+    tables = [GoldRate.__table__, GoldRateRollup.__table__]
+    Base.metadata.drop_all(bind=engine, tables=tables)
+    Base.metadata.create_all(bind=engine, tables=tables)
+    session_factory = sessionmaker(bind=engine)
+
+    def slow_source():
+        time.sleep(args.fetch_ms / 1000)
+        return {24: 420000.0 + time.time() % 1000}
+
+    # drive the shared refresher from requests only: no background thread
+    rate_refresher.fetch = slow_source
+    rate_refresher.interval = args.ttl
+    rate_refresher.session_factory = session_factory
+    rate_refresher.on_refresh = lambda: None  # no catalog to reprice here
+    rate_refresher._refreshing.acquire()
+    rate_refresher._attempt_locked()  # seed one set of rates
+
+    app = FastAPI()
+    app.include_router(rates.router)
+
+    def override_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+    app.dependency_overrides[get_db] = override_db
+    client = TestClient(app)
+
+    samples: list[tuple[float, float]] = []  # (start offset, latency ms)
+    lock = threading.Lock()
+    started = time.perf_counter()
+
+    def worker():
+        local = []
+        while (now := time.perf_counter()) - started < args.seconds:
+            response = client.get("/rates/latest")
+            assert response.status_code == 200
+            local.append((now - started, (time.perf_counter() - now) * 1000))
+        with lock:
+            samples.extend(local)
+
+    threads = [threading.Thread(target=worker) for _ in range(args.clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    time.sleep(args.fetch_ms / 1000 + 0.1)  # let the last refresh land
+
+    # requests that started within one fetch time after an expiry would have
+    # paid for the scrape under the old read-through cache
+    window = args.fetch_ms / 1000
+    boundary = [ms for offset, ms in samples if offset % args.ttl < window]
+    steady = [ms for offset, ms in samples if offset % args.ttl >= window]
+    latencies = [ms for _, ms in samples]
+    stored = session_factory().query(GoldRate).count()
+
+    print(f"requests: {len(samples)} from {args.clients} clients over {args.seconds}s, ttl {args.ttl}s, "
+          f"source {args.fetch_ms:.0f} ms")
+    for label, values in (("all", latencies), ("after expiry", boundary), ("steady", steady)):
+        print(f"  {label:<13} p50 {statistics.median(values) if values else 0:7.2f} ms   "
+              f"p99 {percentile(values, 99):7.2f} ms   max {max(values, default=0):7.2f} ms")
+    print(f"source fetches: {rate_refresher.fetches} (~{args.seconds / args.ttl:.0f} expiries), "
+          f"gold_rates rows: {stored}")
+
+
+if __name__ == "__main__":
+    main()
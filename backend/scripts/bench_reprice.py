@@ -0,0 +1,63 @@
+"""
+Time a full-catalog reprice against a seeded product table.
+
+    python -m backend.scripts.bench_reprice --products 100000
+
+Uses its own database (--url, SQLite file by default).
+"""
+import argparse
+import random
+import time
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from backend.database import Base
+from backend.models import CatalogState, Product
+from backend.services.pricing import reprice_catalog
+
+KARATS = [24, 22, 21, 18]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default="sqlite:///bench_reprice.db")
+    parser.add_argument("--products", type=int, default=100_000)
+    args = parser.parse_args()
+
+    engine = create_engine(args.url)
+    # reprice_catalog stamps changed products with a new catalog version
+    tables = [Product.__table__, CatalogState.__table__]
+    Base.metadata.drop_all(bind=engine, tables=tables)
+    Base.metadata.create_all(bind=engine, tables=tables)
+    db = sessionmaker(bind=engine)()
+
+    rnd = random.Random(3)
+    db.execute(insert(Product.__table__), [
+        {
+            "name": f"Product {i}",
+            "metal_type": "gold",
+            "karat": rnd.choice(KARATS),
+            "weight_grams": round(rnd.uniform(1, 60), 2),
+            "price": 0.0,
+            "making_charge": 5000.0,
+            "stock_quantity": 1,
+        }
+        for i in range(args.products)
+    ])
+    db.commit()
+
+    rates = {24: 24000.0, 22: 22000.0, 21: 21000.0, 18: 18000.0}
+    for label, gram_rates in [
+        ("initial price (all rows change)", rates),
+        ("same rate (no rows change)", rates),
+        ("24K +0.5% (all rows change)", {k: v * 1.005 for k, v in rates.items()}),
+    ]:
+        t0 = time.perf_counter()
+        stats = reprice_catalog(db, gram_rates)
+        print(f"{label:<34} changed={stats['changed']:>7}  {time.perf_counter() - t0:.2f}s")
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Compare the regex gold price parser with the original BeautifulSoup
+text-splitting parser on the fixture pages in scripts/fixtures, plus a
+padded copy that is closer to the size of the real site. Exits non-zero
+when the two parsers disagree on a page the legacy parser can read.
+
+    python -m backend.scripts.bench_scraper_parser --repeat 200 --pad-kb 150
+"""
+import argparse
+import timeit
+from pathlib import Path
+
+from backend.utils.scraper import parse_gold_prices, parse_gold_prices_legacy
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+FILLER = (
+    '<article class="news"><h3><a href="/news/{i}">Market update {i}</a></h3>'
+    '<p>Silver and currency markets moved today as traders watched global cues. '
+    'Analysts expect volatility to continue through the week.</p></article>\n'
+)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--pad-kb", type=int, default=150, help="filler markup added before and after the rates table")
+    args = parser.parse_args()
+
+    pages = {path.name: path.read_text() for path in sorted(FIXTURES.glob("*.html"))}
+    base = pages["gold_rates.html"]
+    filler, i = [], 0
+    while sum(map(len, filler)) < args.pad_kb * 1024:
+        filler.append(FILLER.format(i=i))
+        i += 1
+    half = len(filler) // 2
+    padded = base.replace("<body>", "<body>" + "".join(filler[:half])).replace("</body>", "".join(filler[half:]) + "</body>")
+    pages[f"gold_rates.html + {args.pad_kb} KB"] = padded
+
+    mismatches = 0
+    print(f"{'page':<32} {'size':>8} {'legacy':>11} {'regex':>11} {'speed-up':>9}  result")
+    for name, html in pages.items():
+        legacy = parse_gold_prices_legacy(html)
+        fast = parse_gold_prices(html)
+        if legacy.get(24) and fast != legacy:
+            verdict = f"MISMATCH legacy={legacy} regex={fast}"
+            mismatches += 1
+        else:
+            verdict = fast or "no 24K price (scraper returns None)"
+        legacy_us = timeit.timeit(lambda: parse_gold_prices_legacy(html), number=args.repeat) / args.repeat * 1e6
+        fast_us = timeit.timeit(lambda: parse_gold_prices(html), number=args.repeat) / args.repeat * 1e6
+        print(f"{name:<32} {len(html) / 1024:>6.1f}KB {legacy_us:>9.1f}us {fast_us:>9.1f}us "
+              f"{legacy_us / fast_us:>8.1f}x  {verdict}")
+    if mismatches:
+        raise SystemExit(f"{mismatches} page(s) parsed differently")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Local stand-in for the gold rate site, serving fixture HTML so the rate
+refresher can be exercised without touching the real source.
+
+    python -m backend.scripts.rate_source_stub --port 8765 --fail-rate 0.3
+    GOLD_SCRAPER_URL=http://127.0.0.1:8765/ uvicorn backend.main:app
+
+--fail-rate answers that share of requests with a 503, --delay stalls every
+response, and each successful response nudges the 24K price by up to
+--drift PKR so consecutive refreshes see moving rates.
+"""
+import argparse
+import random
+import re
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+FIXTURE = Path(__file__).parent / "fixtures" / "gold_rates.html"
+
+
+def make_handler(html: str, fail_rate: float, delay: float, drift: float):
+    base = float(re.search(r"24K</td>\s*<td>([\d,]+)", html).group(1).replace(",", ""))
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if delay:
+                time.sleep(delay)
+            if random.random() < fail_rate:
+                self.send_error(503, "Source unavailable")
+                return
+            price = base + random.uniform(-drift, drift)
+            body = html.replace(f"{base:,.0f}", f"{price:,.0f}", 1).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--fixture", type=Path, default=FIXTURE)
+    parser.add_argument("--fail-rate", type=float, default=0.0)
+    parser.add_argument("--delay", type=float, default=0.0)
+    parser.add_argument("--drift", type=float, default=500.0)
+    args = parser.parse_args()
+
+    handler = make_handler(args.fixture.read_text(), args.fail_rate, args.delay, args.drift)
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), handler)
+    print(f"Serving {args.fixture.name} on http://127.0.0.1:{args.port}/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+# backend/services/alerts.py
+import threading
+
+from backend.configs import settings
+from backend.database import SessionLocal
+from backend.services import outbox
+from backend.services.logger import logger
+
+
+class LowStockAlerts:
+    """
+    Collects products that dropped to the low-stock threshold and mails them
+    to the shop as one digest per window instead of one email per order line.
+    A product noted several times in a window appears once, at its latest level.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending: dict[int, tuple[str, int]] = {}
+
+    def note(self, product_id: int, name: str, stock: int):
+        with self._lock:
+            self._pending[product_id] = (name, stock)
+
+    def note_crossing(self, product_id: int, name: str, old_stock: int, new_stock: int):
+        """Note the product only when this change takes it to or below the threshold."""
+        if old_stock > settings.LOW_STOCK_THRESHOLD >= new_stock:
+            self.note(product_id, name, new_stock)
+
+    def flush(self) -> int:
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+        lines = [
+            f"- {name} (#{product_id}): {stock} left"
+            for product_id, (name, stock) in sorted(pending.items(), key=lambda item: item[1][1])
+        ]
+        db = SessionLocal()
+        try:
+            # the outbox dispatcher sends it and retries on SMTP failures
+            outbox.enqueue(
+                db, "email",
+                to_email=settings.LOW_STOCK_ALERT_EMAIL,
+                subject=f"Low stock alert: {len(pending)} product(s)",
+                body="These products are running low:\n\n" + "\n".join(lines),
+            )
+            db.commit()
+        except Exception:
+            # put them back so the next window retries, unless newer levels arrived meanwhile
+            with self._lock:
+                for product_id, entry in pending.items():
+                    self._pending.setdefault(product_id, entry)
+            raise
+        finally:
+            db.close()
+        logger.info(f"Low stock digest queued for {len(pending)} products")
+        return len(pending)
+
+
+# Shared instance fed by the stock write paths
+low_stock_alerts = LowStockAlerts()
+
+
+def flush_low_stock_job():
+    low_stock_alerts.flush()
@@ -1,43 +1,228 @@
 # backend/services/cache.py
-from functools import wraps
-import pickle
-import time
+import asyncio
 import inspect
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from functools import wraps
+
+from fastapi import BackgroundTasks, Request, Response
+from pydantic import BaseModel
+from sqlalchemy.orm import Session
+
+# Dependency-injected values that must never become part of a cache key
+INJECTED_TYPES = (Session, Request, Response, BackgroundTasks)
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    Bounded in-memory LRU cache with per-entry expiry.
+
+    Values are stored as-is (no pickling), so callers should cache immutable
+    or serialised payloads and must not mutate what they get back.
+    get_or_compute() / aget_or_compute() make concurrent misses on the same
+    key wait for a single computation instead of stampeding the database.
+    A delete() or clear() during a computation bumps the generation, so the
+    value computed before it is returned to the waiting callers but not stored.
+    """
+
+    def __init__(self, name: str, maxsize: int = 1024, ttl: float = 300):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.RLock()
+        self._inflight: dict = {}
+        self._async_inflight: dict = {}
+        self._generation = 0
+        self.hits = self.misses = self.evictions = self.expirations = 0
+
+    def _lookup(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return _MISSING
+            value, expire_at = entry
+            if expire_at <= time.monotonic():
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return _MISSING
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def get(self, key, default=None):
+        value = self._lookup(key)
+        return default if value is _MISSING else value
+
+    def set(self, key, value, ttl: float | None = None):
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + (self.ttl if ttl is None else ttl))
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def _set_if_current(self, key, value, ttl: float | None, generation: int):
+        with self._lock:
+            if self._generation == generation:
+                self.set(key, value, ttl)
+
+    def delete(self, key):
+        with self._lock:
+            self._generation += 1
+            self._data.pop(key, None)
+            # later callers must not join a computation that started before this
+            self._inflight.pop(key, None)
+            self._async_inflight.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._data.clear()
+            self._inflight.clear()
+            self._async_inflight.clear()
 
-# Simple in-memory cache
-_in_memory_cache = {}
+    def get_or_compute(self, key, compute, ttl: float | None = None):
+        value = self._lookup(key)
+        if value is not _MISSING:
+            return value
+        with self._lock:
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = Future()
+                generation = self._generation
+        if not leader:
+            return flight.result()
+        try:
+            value = compute()
+            self._set_if_current(key, value, ttl, generation)
+            flight.set_result(value)
+            return value
+        except BaseException as e:
+            flight.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                if self._inflight.get(key) is flight:
+                    del self._inflight[key]
 
-def cache_response(ttl: int = 300):
+    async def aget_or_compute(self, key, compute, ttl: float | None = None):
+        """Async twin of get_or_compute; `compute` is a zero-argument coroutine function."""
+        value = self._lookup(key)
+        if value is not _MISSING:
+            return value
+        flight = self._async_inflight.get(key)
+        if flight is not None:
+            return await asyncio.shield(flight)
+        flight = self._async_inflight[key] = asyncio.get_running_loop().create_future()
+        generation = self._generation
+        try:
+            value = await compute()
+            self._set_if_current(key, value, ttl, generation)
+            flight.set_result(value)
+            return value
+        except BaseException as e:
+            flight.set_exception(e)
+            flight.exception()  # mark retrieved so a lone leader doesn't log "never retrieved"
+            raise
+        finally:
+            if self._async_inflight.get(key) is flight:
+                self._async_inflight.pop(key, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "name": self.name,
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+
+# --- Named cache registry ---
+
+_caches: dict[str, TTLCache] = {}
+_registry_lock = threading.Lock()
+
+
+def get_cache(name: str, maxsize: int = 1024, ttl: float = 300) -> TTLCache:
+    with _registry_lock:
+        if name not in _caches:
+            _caches[name] = TTLCache(name, maxsize=maxsize, ttl=ttl)
+        return _caches[name]
+
+
+def invalidate(name: str, key=_MISSING):
+    """Drop one key, or the whole named cache when no key is given."""
+    cache = _caches.get(name)
+    if cache is None:
+        return
+    if key is _MISSING:
+        cache.clear()
+    else:
+        cache.delete(key)
+
+
+def cache_stats() -> list[dict]:
+    return [cache.stats() for cache in list(_caches.values())]
+
+
+# --- Decorator ---
+
+def _freeze(value):
+    if isinstance(value, BaseModel):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.model_dump().items()))
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return tuple(_freeze(v) for v in value)
+    try:
+        hash(value)
+        return value
+    except TypeError:
+        return repr(value)
+
+
+def cache_response(ttl: int = 300, maxsize: int = 1024, name: str | None = None, ignore: tuple[str, ...] = ()):
     """
-    Cache decorator without Redis. Works for both sync and async functions.
+    Cache a route or service function. The key is built from its bound
+    arguments, skipping DB sessions, requests, responses, background tasks and
+    any parameter named in `ignore`. Works for sync and async functions; use
+    wrapper.cache for stats or get_cache(name) to invalidate.
     """
     def decorator(func):
+        cache = get_cache(name or f"{func.__module__}.{func.__qualname__}", maxsize=maxsize, ttl=ttl)
+        signature = inspect.signature(func)
+
+        def make_key(args, kwargs):
+            bound = signature.bind_partial(*args, **kwargs)
+            return tuple(
+                (param, _freeze(value))
+                for param, value in bound.arguments.items()
+                if param not in ignore and not isinstance(value, INJECTED_TYPES)
+            )
+
+        if inspect.iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                return await cache.aget_or_compute(make_key(args, kwargs), lambda: func(*args, **kwargs))
+            async_wrapper.cache = cache
+            return async_wrapper
+
         @wraps(func)
         def sync_wrapper(*args, **kwargs):
-            key = f"{func.__name__}:{str(args)}:{str(kwargs)}"
-            cached_entry = _in_memory_cache.get(key, None)
-
-            # Check cache and expiry
-            if cached_entry:
-                value, expire_at = cached_entry
-                if time.time() < expire_at:
-                    return pickle.loads(value)
-                else:
-                    del _in_memory_cache[key]
-
-            # Call function
-            if inspect.iscoroutinefunction(func):
-                # async function
-                async def async_call():
-                    result = await func(*args, **kwargs)
-                    _in_memory_cache[key] = (pickle.dumps(result), time.time() + ttl)
-                    return result
-                return async_call()
-            else:
-                # sync function
-                result = func(*args, **kwargs)
-                _in_memory_cache[key] = (pickle.dumps(result), time.time() + ttl)
-                return result
-
+            return cache.get_or_compute(make_key(args, kwargs), lambda: func(*args, **kwargs))
+        sync_wrapper.cache = cache
         return sync_wrapper
     return decorator
@@ -0,0 +1,115 @@
+# backend/services/catalog.py
+import hashlib
+
+from fastapi import Request
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from backend.models import CatalogState, Product
+from backend.schemas import ProductOut
+from backend.services.cache import get_cache
+
+STAMP_BATCH_SIZE = 1000  # product ids per version UPDATE
+
+# product id -> ((version, reserved_quantity), serialised ProductOut). Entries
+# are checked against the row on every read, so the TTL only bounds memory.
+product_cache = get_cache("product_detail", maxsize=10000, ttl=3600)
+
+
+def catalog_version(db: Session) -> int:
+    """
+    Bumped by every transaction that changes products, stock, holds or prices. It is
+    read from the database, so every worker process agrees on it.
+    """
+    return db.query(CatalogState.version).filter(CatalogState.id == 1).scalar() or 0
+
+
+def product_version(db: Session, product_id: int) -> tuple | None:
+    """
+    What a product's representation depends on: its catalog version plus the
+    reserved quantity, which cart holds move without stamping the product.
+    None if the product doesn't exist.
+    """
+    row = db.query(Product.version, Product.reserved_quantity).filter(Product.id == product_id).first()
+    return tuple(row) if row else None
+
+
+def bump_version(db: Session) -> int:
+    """
+    Bump the catalog version in the caller's transaction and return it.
+    Enough on its own when only reserved_quantity moved: list, search and
+    facet responses are keyed on the catalog version, while each product's
+    detail ETag already includes its reserved quantity, so no row is stamped.
+    Call it last, just before commit, like mark_changed.
+    """
+    db.flush()  # write pending product changes (and take their row locks) first
+    bumped = db.execute(update(CatalogState).where(CatalogState.id == 1).values(version=CatalogState.version + 1))
+    if not bumped.rowcount:
+        # first change ever recorded in this database
+        db.add(CatalogState(id=1, version=1))
+        db.flush()
+    return db.query(CatalogState.version).filter(CatalogState.id == 1).scalar()
+
+
+def mark_changed(db: Session, product_ids):
+    """
+    Bump the catalog version and stamp it on the given products, in the
+    caller's transaction. Call it last, just before commit, once the caller
+    holds (or has just written) those product rows: the catalog_state row is
+    then always locked after the products and only for a moment.
+    """
+    product_ids = list(product_ids)
+    if not product_ids:
+        return
+    version = bump_version(db)
+    for start in range(0, len(product_ids), STAMP_BATCH_SIZE):
+        db.execute(
+            update(Product)
+            .where(Product.id.in_(product_ids[start:start + STAMP_BATCH_SIZE]))
+            .values(version=version)
+            .execution_options(synchronize_session=False)
+        )
+
+
+def product_payloads(db: Session, product_ids: list[int]) -> dict[int, dict]:
+    """
+    Serialised products by id, read through the detail cache. Current
+    versions are read with one narrow IN query and every miss or outdated
+    entry is fetched with one more; each payload is cached under the version
+    it was loaded with, so a read racing a write can never pin stale data.
+    """
+    current = {
+        product_id: (version, reserved)
+        for product_id, version, reserved in db.query(Product.id, Product.version, Product.reserved_quantity)
+        .filter(Product.id.in_(product_ids))
+    }
+    payloads, missing = {}, []
+    for product_id, version in current.items():
+        entry = product_cache.get(product_id)
+        if entry is not None and entry[0] == version:
+            payloads[product_id] = entry[1]
+        else:
+            missing.append(product_id)
+
+    if missing:
+        for product in db.query(Product).filter(Product.id.in_(missing)):
+            payload = ProductOut.model_validate(product).model_dump(mode="json")
+            payloads[product.id] = payload
+            product_cache.set(product.id, ((product.version, product.reserved_quantity), payload))
+    return payloads
+
+
+def make_etag(*parts) -> str:
+    digest = hashlib.sha1(repr(parts).encode()).hexdigest()
+    return f'"{digest}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """True when the client's If-None-Match already names this representation."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    candidates = [tag.strip().removeprefix("W/") for tag in header.split(",")]
+    return etag in candidates
@@ -1,5 +1,6 @@
 import smtplib
 from email.message import EmailMessage
+from backend.configs import settings
 # import app.services.order as order
 from backend.routes import orders
 from fastapi import background, logger
@@ -12,7 +13,8 @@ def send_email_smtp(to_email: str, subject: str, body: str):
     msg["To"] = to_email
     msg.set_content(body)
     # Example using local SMTP / or configure SMTP in settings
-    with smtplib.SMTP("localhost") as s:
+    # a bounded wait: the outbox dispatcher sends these one after another
+    with smtplib.SMTP("localhost", timeout=settings.SMTP_TIMEOUT_SECONDS) as s:
         s.send_message(msg)
 
 # Enhanced email service with templates
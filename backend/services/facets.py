@@ -0,0 +1,71 @@
+# backend/services/facets.py
+from sqlalchemy import case, func
+from sqlalchemy.orm import Session
+
+from backend.models import Product
+from backend.reprossitories import product_repo
+from backend.schemas import ProductFilter
+from backend.services.cache import get_cache
+
+# Upper bounds (PKR) of the storefront price buckets; anything above the last goes in "<last>+"
+PRICE_BUCKET_BOUNDS = [50000, 100000, 250000, 500000, 1000000]
+
+# Keyed by catalog version, so a change anywhere simply stops old entries
+# from being hit; they age out of the LRU.
+facet_cache = get_cache("product_facets", maxsize=512, ttl=600)
+
+
+def _price_bucket_labels() -> list[str]:
+    labels, lower = [], 0
+    for upper in PRICE_BUCKET_BOUNDS:
+        labels.append(f"{lower}-{upper}")
+        lower = upper
+    labels.append(f"{lower}+")
+    return labels
+
+
+PRICE_BUCKETS = _price_bucket_labels()
+
+
+def _price_bucket_expr():
+    return case(
+        *[(Product.price < upper, i) for i, upper in enumerate(PRICE_BUCKET_BOUNDS)],
+        else_=len(PRICE_BUCKET_BOUNDS),
+    )
+
+
+def facet_signature(version: int, query: str | None, filters: ProductFilter) -> tuple:
+    return (version, (query or "").strip().lower()) + tuple(sorted(filters.model_dump().items()))
+
+
+def compute_facets(db: Session, filters: ProductFilter, product_ids: list[int] | None = None) -> dict:
+    """
+    Count products per metal, karat, category, price bucket and stock state
+    for the given filter set in one GROUP BY over those five columns; the
+    combinations are then folded into per-facet totals.
+    """
+    bucket = _price_bucket_expr().label("bucket")
+    in_stock = (Product.stock_quantity - Product.reserved_quantity > 0).label("in_stock")
+    q = db.query(Product.metal_type, Product.karat, Product.category, bucket, in_stock, func.count(Product.id))
+    q = product_repo.apply_filters(q, filters)
+    if product_ids is not None:
+        q = q.filter(Product.id.in_(product_ids))
+    rows = q.group_by(Product.metal_type, Product.karat, Product.category, bucket, in_stock).all()
+
+    facets = {
+        "total": 0,
+        "metal_type": {},
+        "karat": {},
+        "category": {},
+        "price": {label: 0 for label in PRICE_BUCKETS},
+        "in_stock": {"true": 0, "false": 0},
+    }
+    for metal_type, karat, category, bucket_index, stocked, count in rows:
+        facets["total"] += count
+        for name, value in (("metal_type", metal_type), ("karat", karat), ("category", category)):
+            key = str(value)
+            facets[name][key] = facets[name].get(key, 0) + count
+        facets["price"][PRICE_BUCKETS[bucket_index]] += count
+        facets["in_stock"]["true" if stocked else "false"] += count
+    return facets
+
@@ -0,0 +1,229 @@
+# backend/services/gold_rates.py
+import hashlib
+import json
+import random
+import threading
+import time
+from datetime import datetime
+from typing import NamedTuple
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from backend.configs import settings
+from backend.database import SessionLocal
+from backend.models import GoldRate
+from backend.schemas import GoldRateOut
+from backend.services import rate_rollups
+from backend.services.logger import logger
+from backend.services.pricing import reprice_catalog_job
+from backend.utils.calculation import karat_price_from_24k_tola, price_per_gram_from_tola
+from backend.utils.scraper import scrape_gold_prices
+
+KARATS = [24, 22, 21, 18, 12, 10]
+
+
+def rates_from_prices(prices: dict[int, float] | None) -> list[GoldRate] | None:
+    """GoldRate rows for every karat, derived from the scraped 24K tola price."""
+    price_24k = (prices or {}).get(24)
+    if not price_24k:
+        return None
+    rates = []
+    for karat in KARATS:
+        tola_price = karat_price_from_24k_tola(price_24k, karat)
+        rates.append(GoldRate(
+            karat=karat,
+            price_per_tola=tola_price,
+            price_per_gram=price_per_gram_from_tola(tola_price),
+            source="live",
+        ))
+    return rates
+
+
+def newest_rates(db: Session) -> list[GoldRate]:
+    """Newest stored row of every karat, highest karat first."""
+    newest = select(func.max(GoldRate.id)).group_by(GoldRate.karat)
+    return db.query(GoldRate).filter(GoldRate.id.in_(newest)).order_by(GoldRate.karat.desc()).all()
+
+
+def _same_price(old: float | None, new: float) -> bool:
+    return old is not None and round(old, 2) == round(new, 2)
+
+
+def _implausible(old: float | None, new: float) -> bool:
+    """A move too large to be a market change; almost always a misread page."""
+    return bool(old) and abs(new - old) > old * settings.RATE_MAX_CHANGE_PERCENT / 100
+
+
+class RatesSnapshot(NamedTuple):
+    """Immutable, already-serialised /rates/latest response."""
+    body: bytes
+    etag: str
+    fetched_at: float  # time.monotonic() the rates correspond to
+
+
+def _snapshot(rows, age_seconds: float = 0.0) -> RatesSnapshot:
+    payload = [GoldRateOut.model_validate(row).model_dump(mode="json") for row in rows]
+    body = json.dumps(payload, separators=(",", ":")).encode()
+    etag = f'"{hashlib.sha1(body).hexdigest()}"'
+    return RatesSnapshot(body, etag, time.monotonic() - age_seconds)
+
+
+class RateRefresher:
+    """
+    Keeps the newest gold rates in memory, so /rates/latest never waits on the
+    source site.
+
+    A background thread polls the source every `interval` seconds (with a
+    little jitter); after failures the wait doubles up to `max_backoff`,
+    randomised so several workers don't retry in lockstep. Readers always get
+    the current snapshot at once: if it has outlived `interval` (thread not
+    running, or stuck) the first reader to notice starts one background
+    refresh and everyone keeps getting the stale copy until it lands.
+    """
+
+    def __init__(self, fetch=scrape_gold_prices, interval: float | None = None,
+                 max_backoff: float | None = None, session_factory=SessionLocal,
+                 on_refresh=reprice_catalog_job):
+        self.fetch = fetch
+        self.on_refresh = on_refresh  # runs after each new set of rates is stored
+        self.interval = interval or settings.RATE_REFRESH_SECONDS
+        self.max_backoff = max_backoff or settings.RATE_REFRESH_MAX_BACKOFF_SECONDS
+        self.session_factory = session_factory
+        self.failures = 0
+        self.fetches = 0
+        self.last_success: float | None = None
+        self._snapshot: RatesSnapshot | None = None
+        self._retry_at = 0.0
+        self._refreshing = threading.Lock()  # at most one refresh in flight
+        self._loading = threading.Lock()     # at most one cold-start read of stored rates
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def snapshot(self) -> RatesSnapshot | None:
+        return self._snapshot
+
+    def current(self, db: Session) -> RatesSnapshot | None:
+        """The snapshot to serve now; never blocks on the source site."""
+        snapshot = self._snapshot
+        if snapshot is None:
+            # cold start: one caller reads the stored rates, the rest wait for it
+            with self._loading:
+                if self._snapshot is None:
+                    self.load_from_db(db)
+            return self._snapshot
+        now = time.monotonic()
+        if now - snapshot.fetched_at > self.interval and now >= self._retry_at:
+            self._revalidate_in_background()
+        return snapshot
+
+    def load_from_db(self, db: Session, age_seconds: float | None = None) -> RatesSnapshot | None:
+        """
+        Newest stored rate per karat; used at start-up and after manual
+        inserts. The snapshot's age is taken from the rows unless given.
+        """
+        rows = newest_rates(db)
+        if rows:
+            if age_seconds is None:
+                age_seconds = max((datetime.utcnow() - max(row.created_at for row in rows)).total_seconds(), 0.0)
+            self._snapshot = _snapshot(rows, age_seconds)
+        return self._snapshot
+
+    def refresh_once(self) -> bool:
+        """Scrape, store and publish one set of rates. Call with _refreshing held."""
+        db = self.session_factory()
+        try:
+            # another worker process may have just refreshed: adopt its rows instead of scraping again
+            newest = db.query(GoldRate.created_at).filter(GoldRate.source == "live").order_by(GoldRate.id.desc()).first()
+            if newest and (datetime.utcnow() - newest.created_at).total_seconds() < self.interval * 0.9:
+                self.load_from_db(db)
+                return True
+
+            self.fetches += 1
+            rates = rates_from_prices(self.fetch())
+            if not rates:
+                return False
+            stored = {row.karat: row.price_per_tola for row in newest_rates(db)}
+            scraped_24k = next(rate.price_per_tola for rate in rates if rate.karat == 24)
+            if _implausible(stored.get(24), scraped_24k):
+                # keep serving the previous snapshot; a real jump can be entered via /rates/manual
+                logger.error(f"Rejected scraped 24K rate {scraped_24k} "
+                             f"(stored {stored[24]}, limit {settings.RATE_MAX_CHANGE_PERCENT}%)")
+                return False
+            # only karats whose price moved get a new row
+            changed = [rate for rate in rates if not _same_price(stored.get(rate.karat), rate.price_per_tola)]
+            if changed:
+                db.add_all(changed)
+                db.flush()
+                rate_rollups.fold(db, changed, rate_rollups.RESOLUTIONS)
+                db.commit()
+            self.load_from_db(db, age_seconds=0.0)
+        finally:
+            db.close()
+        self.last_success = time.time()
+        if changed:
+            self.on_refresh()
+        return True
+
+    def _attempt(self) -> bool | None:
+        """One guarded refresh; None when another one is already running."""
+        if not self._refreshing.acquire(blocking=False):
+            return None
+        return self._attempt_locked()
+
+    def _attempt_locked(self) -> bool:
+        try:
+            ok = self.refresh_once()
+        except Exception:
+            logger.exception("Gold rate refresh failed")
+            ok = False
+        finally:
+            self._refreshing.release()
+        self.failures = 0 if ok else self.failures + 1
+        if ok:
+            self._retry_at = 0.0
+        else:
+            self._retry_at = time.monotonic() + self.next_delay()
+            logger.warning(f"Gold rate source unavailable ({self.failures} failures in a row)")
+        return ok
+
+    def _revalidate_in_background(self):
+        # the reader that wins the lock hands it to the refresh thread; others just move on
+        if self._refreshing.acquire(blocking=False):
+            threading.Thread(target=self._attempt_locked, name="gold-rate-revalidate", daemon=True).start()
+
+    def next_delay(self) -> float:
+        if not self.failures:
+            return self.interval * random.uniform(0.9, 1.1)
+        ceiling = min(self.max_backoff, self.interval * 2 ** (self.failures - 1))
+        return random.uniform(ceiling / 2, ceiling)
+
+    def _run(self):
+        if self._snapshot is None:
+            db = self.session_factory()
+            try:
+                with self._loading:
+                    self.load_from_db(db)
+            except Exception:
+                logger.exception("Loading stored gold rates failed")
+            finally:
+                db.close()
+        while not self._stop.is_set():
+            self._attempt()
+            if self._stop.wait(self.next_delay()):
+                return
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="gold-rate-refresher", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+
+# Shared instance started by the app lifespan
+rate_refresher = RateRefresher()
@@ -0,0 +1,140 @@
+# backend/services/idempotency.py
+import hashlib
+import json
+from datetime import datetime, timedelta
+
+from fastapi import HTTPException
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from backend.configs import settings
+from backend.database import SessionLocal
+from backend.models import IdempotencyKey
+from backend.services.logger import logger
+
+MAX_KEY_LENGTH = 64
+PURGE_BATCH_SIZE = 1000
+REPLAY_HEADER = "Idempotent-Replayed"
+
+
+def fingerprint(payload: BaseModel) -> str:
+    body = json.dumps(payload.model_dump(mode="json"), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(body.encode()).hexdigest()
+
+
+def _lookup(db: Session, scope: str, key: str) -> IdempotencyKey | None:
+    return db.query(IdempotencyKey).filter(IdempotencyKey.scope == scope, IdempotencyKey.key == key).first()
+
+
+def _replay(stored: IdempotencyKey, request_fingerprint: str) -> JSONResponse:
+    if stored.fingerprint != request_fingerprint:
+        raise HTTPException(422, "Idempotency-Key was already used for a different request")
+    return JSONResponse(
+        content=json.loads(stored.response_body),
+        status_code=stored.status_code,
+        headers={REPLAY_HEADER: "true"},
+    )
+
+
+def claim(db: Session, scope: str, key: str | None, payload: BaseModel) -> IdempotencyKey | JSONResponse | None:
+    """
+    Start an idempotent request. Returns the stored response when `key` was
+    already completed in `scope`, otherwise a new key row added to the
+    caller's transaction (None when the client sent no key).
+
+    The row is flushed straight away, so a concurrent retry blocks on the
+    unique (scope, key) index until the first request commits and then
+    replays its response. If the first request fails and rolls back, the
+    key goes with it and the retry runs normally.
+    """
+    if key is None:
+        return None
+    if not key or len(key) > MAX_KEY_LENGTH:
+        raise HTTPException(400, f"Idempotency-Key must be 1-{MAX_KEY_LENGTH} characters")
+
+    request_fingerprint = fingerprint(payload)
+    now = datetime.utcnow()
+    expires_at = now + timedelta(hours=settings.IDEMPOTENCY_TTL_HOURS)
+    stored = _lookup(db, scope, key)
+    if stored is not None:
+        if stored.expires_at > now:
+            return _replay(stored, request_fingerprint)
+        # Expired: reuse the row in place. Deleting it and adding a new one
+        # with the same key would be flushed INSERT first and hit the unique
+        # index. The lock makes a concurrent retry wait for us, then replay.
+        stored = (
+            db.query(IdempotencyKey)
+            .filter(IdempotencyKey.id == stored.id)
+            .with_for_update()
+            .populate_existing()
+            .first()
+        )
+        if stored is not None:
+            if stored.expires_at > now:
+                if stored.status_code is None:
+                    raise HTTPException(409, "A request with this Idempotency-Key is still being processed")
+                return _replay(stored, request_fingerprint)
+            stored.fingerprint = request_fingerprint
+            stored.status_code = None
+            stored.response_body = None
+            stored.created_at = now
+            stored.expires_at = expires_at
+            db.flush()
+            return stored
+
+    record = IdempotencyKey(
+        scope=scope,
+        key=key,
+        fingerprint=request_fingerprint,
+        expires_at=expires_at,
+    )
+    db.add(record)
+    try:
+        db.flush()
+    except IntegrityError:
+        db.rollback()
+        stored = _lookup(db, scope, key)
+        if stored is None or stored.status_code is None:
+            raise HTTPException(409, "A request with this Idempotency-Key is still being processed")
+        return _replay(stored, request_fingerprint)
+    return record
+
+
+def complete(record: IdempotencyKey | None, body, status_code: int = 200):
+    """Attach the response to the key; it commits with the work it describes."""
+    if record is None:
+        return
+    record.status_code = status_code
+    record.response_body = json.dumps(jsonable_encoder(body), separators=(",", ":"))
+
+
+def purge_expired(db: Session, now: datetime | None = None) -> int:
+    """Delete expired keys in small batches so the purge never holds long locks."""
+    now = now or datetime.utcnow()
+    purged = 0
+    while True:
+        ids = [
+            row.id for row in db.query(IdempotencyKey.id)
+            .filter(IdempotencyKey.expires_at <= now)
+            .limit(PURGE_BATCH_SIZE)
+        ]
+        if not ids:
+            return purged
+        db.query(IdempotencyKey).filter(IdempotencyKey.id.in_(ids)).delete(synchronize_session=False)
+        db.commit()
+        purged += len(ids)
+        if len(ids) < PURGE_BATCH_SIZE:
+            return purged
+
+
+def purge_expired_job():
+    db = SessionLocal()
+    try:
+        purged = purge_expired(db)
+    finally:
+        db.close()
+    if purged:
+        logger.info(f"Purged {purged} expired idempotency keys")
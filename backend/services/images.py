@@ -0,0 +1,110 @@
+# backend/services/images.py
+import hashlib
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+from fastapi import HTTPException, UploadFile
+from PIL import Image
+from starlette.concurrency import run_in_threadpool
+
+from backend.configs import settings
+from backend.database import SessionLocal
+from backend.models import Product
+from backend.services.catalog import mark_changed
+from backend.services.logger import logger
+
+UPLOAD_DIR = "uploads/products"
+os.makedirs(UPLOAD_DIR, exist_ok=True)
+
+ALLOWED_EXTENSIONS = ("jpg", "jpeg", "png", "webp")
+CHUNK_SIZE = 1024 * 1024
+
+# variant name -> (longest side in px or None for full size, file extension or None to keep the original's)
+VARIANTS = {
+    "thumbnail": (200, None),
+    "medium": (600, None),
+    "webp": (None, "webp"),
+}
+
+_pool: ProcessPoolExecutor | None = None
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=2)
+    return _pool
+
+
+async def save_upload(file: UploadFile, ext: str) -> str:
+    """
+    Stream an upload to disk in chunks off the event loop, enforcing the size
+    cap, and name it after its SHA-256 so re-uploads of the same picture are
+    stored once. Returns the stored file name.
+    """
+    max_bytes = settings.MAX_IMAGE_UPLOAD_MB * 1024 * 1024
+    digest = hashlib.sha256()
+    size = 0
+    fd, tmp_path = tempfile.mkstemp(dir=UPLOAD_DIR, suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as buffer:
+            while chunk := await file.read(CHUNK_SIZE):
+                size += len(chunk)
+                if size > max_bytes:
+                    raise HTTPException(413, f"Image larger than {settings.MAX_IMAGE_UPLOAD_MB} MB")
+                digest.update(chunk)
+                await run_in_threadpool(buffer.write, chunk)
+
+        filename = f"{digest.hexdigest()}.{ext}"
+        path = os.path.join(UPLOAD_DIR, filename)
+        if os.path.exists(path):
+            os.remove(tmp_path)
+        else:
+            os.replace(tmp_path, path)
+        return filename
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def render_variants(filename: str) -> dict[str, str]:
+    """Resize one stored original into every variant. Runs in a worker process."""
+    stem, ext = filename.rsplit(".", 1)
+    variants = {"original": filename}
+    with Image.open(os.path.join(UPLOAD_DIR, filename)) as original:
+        original.load()
+        for name, (max_side, variant_ext) in VARIANTS.items():
+            variant_file = f"{stem}_{name}.{variant_ext or ext}"
+            variant_path = os.path.join(UPLOAD_DIR, variant_file)
+            if not os.path.exists(variant_path):
+                image = original.copy()
+                if max_side:
+                    image.thumbnail((max_side, max_side))
+                if variant_file.endswith((".jpg", ".jpeg")) and image.mode not in ("RGB", "L"):
+                    image = image.convert("RGB")
+                image.save(variant_path)
+            variants[name] = variant_file
+    return variants
+
+
+def generate_variants_job(product_id: int, filename: str):
+    """Background task: render variants in the process pool, then record them on the product."""
+    try:
+        variants = _get_pool().submit(render_variants, filename).result()
+    except Exception:
+        logger.exception(f"Image variants failed for product {product_id} ({filename})")
+        return
+
+    db = SessionLocal()
+    try:
+        product = db.query(Product).filter(Product.id == product_id).first()
+        # a newer upload may have replaced the image while we were resizing
+        if not product or product.images != filename:
+            return
+        product.image_variants = variants
+        mark_changed(db, [product_id])
+        db.commit()
+    finally:
+        db.close()
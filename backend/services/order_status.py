@@ -0,0 +1,72 @@
+# backend/services/order_status.py
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from backend.models import Order, User
+from backend.schemas import OrderStatus
+from backend.services import outbox, stock_ledger
+
+# Where an order may go next; delivered orders are completed once the return window closes
+TRANSITIONS: dict[OrderStatus, set[OrderStatus]] = {
+    OrderStatus.PENDING: {OrderStatus.PAID, OrderStatus.PROCESSING, OrderStatus.CANCELLED},
+    OrderStatus.PAID: {OrderStatus.PROCESSING, OrderStatus.CANCELLED},
+    OrderStatus.PROCESSING: {OrderStatus.SHIPPED, OrderStatus.CANCELLED},
+    OrderStatus.SHIPPED: {OrderStatus.DELIVERED},
+    OrderStatus.DELIVERED: {OrderStatus.COMPLETED},
+    OrderStatus.COMPLETED: set(),
+    OrderStatus.CANCELLED: set(),
+}
+
+
+def sources(new_status: OrderStatus) -> list[str]:
+    """Statuses an order can be moved to new_status from."""
+    return [old.value for old, targets in TRANSITIONS.items() if new_status in targets]
+
+
+def transition(db: Session, order_ids: list[int], new_status: OrderStatus):
+    """
+    Move every order that is allowed to reach new_status with a single
+    UPDATE ... WHERE id IN (...) AND status IN (...). Cancelled orders have
+    their items restocked. The caller commits.
+
+    Returns (moved ids, {id: current status} for orders that cannot move,
+    restocked product ids); ids that don't exist appear in neither.
+    """
+    allowed = sources(new_status)
+    rows = (
+        db.query(Order.id, Order.status)
+        .filter(Order.id.in_(sorted(set(order_ids))))
+        .order_by(Order.id)
+        .with_for_update()
+        .all()
+    )
+    moved = [order_id for order_id, status in rows if status in allowed]
+    rejected = {order_id: status for order_id, status in rows if status not in allowed}
+
+    restocked = []
+    if moved:
+        db.execute(
+            update(Order)
+            .where(Order.id.in_(moved), Order.status.in_(allowed))
+            .values(status=new_status.value)
+            .execution_options(synchronize_session=False)
+        )
+        if new_status == OrderStatus.CANCELLED:
+            restocked = stock_ledger.restock_orders(db, moved)
+    return moved, rejected, restocked
+
+
+def notify(db: Session, order_ids: list[int], new_status: OrderStatus):
+    """Queue a status email per order in the outbox, in the caller's transaction."""
+    if not order_ids:
+        return
+    recipients = (
+        db.query(Order.id, User.email)
+        .join(User, User.id == Order.user_id)
+        .filter(Order.id.in_(order_ids))
+        .all()
+    )
+    outbox.enqueue_many(db, "order_status_email", [
+        {"user_email": email, "order_id": order_id, "status": new_status.value}
+        for order_id, email in recipients
+    ])
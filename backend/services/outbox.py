@@ -0,0 +1,200 @@
+# backend/services/outbox.py
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, insert, update
+from sqlalchemy.orm import Session
+
+from backend.configs import settings
+from backend.database import SessionLocal
+from backend.models import OutboxMessage
+from backend.services.email_services import send_email_smtp, send_order_status_email
+from backend.services.logger import logger
+
+PENDING, SENT, DEAD = "pending", "sent", "dead"
+
+BATCH_SIZE = 100
+PURGE_BATCH_SIZE = 1000
+BASE_BACKOFF_SECONDS = 30
+MAX_BACKOFF_SECONDS = 3600
+LEASE_SECONDS = 900  # a claimed batch not settled by then is picked up again (outlasts BATCH_SIZE SMTP timeouts)
+
+# topic -> callable(**payload)
+HANDLERS = {
+    "email": send_email_smtp,
+    "order_status_email": send_order_status_email,
+}
+
+
+def enqueue(db: Session, topic: str, **payload):
+    """Record a side effect in the caller's transaction; it is delivered only if that commits."""
+    db.add(OutboxMessage(topic=topic, payload=payload))
+
+
+def enqueue_many(db: Session, topic: str, payloads: list[dict]):
+    if payloads:
+        now = datetime.utcnow()
+        db.execute(insert(OutboxMessage), [
+            {"topic": topic, "payload": payload, "status": PENDING, "attempts": 0,
+             "available_at": now, "created_at": now}
+            for payload in payloads
+        ])
+
+
+class _Metrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.delivered = self.retried = self.dead = self.batches = 0
+        self.last_batch_ms = 0.0
+
+    def record(self, delivered: int, retried: int, dead: int, elapsed: float):
+        with self._lock:
+            self.delivered += delivered
+            self.retried += retried
+            self.dead += dead
+            self.batches += 1
+            self.last_batch_ms = round(elapsed * 1000, 2)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "delivered": self.delivered,
+                "retried": self.retried,
+                "dead": self.dead,
+                "batches": self.batches,
+                "last_batch_ms": self.last_batch_ms,
+            }
+
+
+metrics = _Metrics()
+
+
+def _backoff(attempts: int) -> timedelta:
+    """Exponential backoff with full jitter so failing messages don't retry in lockstep."""
+    ceiling = min(MAX_BACKOFF_SECONDS, BASE_BACKOFF_SECONDS * 2 ** (attempts - 1))
+    return timedelta(seconds=random.uniform(ceiling / 2, ceiling))
+
+
+def _claim(db: Session, batch_size: int, now: datetime) -> list[tuple[int, str, dict, int]]:
+    """
+    Lease a batch of due messages in one short transaction: each is pushed
+    LEASE_SECONDS into the future with its attempt counted, then committed,
+    so no row lock is held while sending. Returns (id, topic, payload, attempts).
+    """
+    messages = (
+        db.query(OutboxMessage)
+        .filter(OutboxMessage.status == PENDING, OutboxMessage.available_at <= now)
+        .order_by(OutboxMessage.available_at, OutboxMessage.id)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+        .all()
+    )
+    lease_until = now + timedelta(seconds=LEASE_SECONDS)
+    claimed = []
+    for message in messages:
+        message.attempts += 1
+        message.available_at = lease_until
+        claimed.append((message.id, message.topic, message.payload, message.attempts))
+    db.commit()
+    return claimed
+
+
+def dispatch_batch(db: Session, batch_size: int = BATCH_SIZE) -> int:
+    """
+    Deliver one batch of due messages. Rows are claimed with FOR UPDATE SKIP
+    LOCKED and leased before anything is sent, so several workers can drain
+    the table without sending the same message twice, and a hung send holds
+    no locks or transaction. Each outcome commits on its own; rows of a worker
+    that dies mid-batch come due again when their lease runs out. Returns the
+    number of rows handled.
+    """
+    started = time.perf_counter()
+    claimed = _claim(db, batch_size, datetime.utcnow())
+    delivered = retried = dead = 0
+    for message_id, topic, payload, attempts in claimed:
+        try:
+            handler = HANDLERS[topic]
+            handler(**payload)
+        except Exception as e:
+            values = {"last_error": f"{type(e).__name__}: {e}"[:1000]}
+            if attempts >= settings.OUTBOX_MAX_ATTEMPTS:
+                values["status"] = DEAD
+                dead += 1
+                logger.error(f"Outbox message {message_id} ({topic}) gave up after {attempts} attempts")
+            else:
+                values["available_at"] = datetime.utcnow() + _backoff(attempts)
+                retried += 1
+        else:
+            values = {"status": SENT, "sent_at": datetime.utcnow(), "last_error": None}
+            delivered += 1
+        # if the lease ran out and another worker re-claimed the row, its attempt owns the outcome
+        db.execute(
+            update(OutboxMessage)
+            .where(OutboxMessage.id == message_id, OutboxMessage.attempts == attempts)
+            .values(**values)
+        )
+        db.commit()
+    if claimed:
+        metrics.record(delivered, retried, dead, time.perf_counter() - started)
+    return len(claimed)
+
+
+def dispatch_pending(db: Session, batch_size: int = BATCH_SIZE) -> int:
+    """Drain everything that is due, one committed batch at a time."""
+    handled = 0
+    while True:
+        count = dispatch_batch(db, batch_size)
+        handled += count
+        if count < batch_size:
+            return handled
+
+
+def dispatch_job():
+    db = SessionLocal()
+    try:
+        dispatch_pending(db)
+    finally:
+        db.close()
+
+
+def purge_sent(db: Session, older_than: datetime) -> int:
+    """Delete delivered messages in small batches."""
+    purged = 0
+    while True:
+        ids = [
+            row.id for row in db.query(OutboxMessage.id)
+            .filter(OutboxMessage.status == SENT, OutboxMessage.sent_at < older_than)
+            .limit(PURGE_BATCH_SIZE)
+        ]
+        if not ids:
+            return purged
+        db.query(OutboxMessage).filter(OutboxMessage.id.in_(ids)).delete(synchronize_session=False)
+        db.commit()
+        purged += len(ids)
+
+
+def purge_sent_job():
+    db = SessionLocal()
+    try:
+        purged = purge_sent(db, datetime.utcnow() - timedelta(days=settings.OUTBOX_RETENTION_DAYS))
+    finally:
+        db.close()
+    if purged:
+        logger.info(f"Purged {purged} delivered outbox messages")
+
+
+def stats(db: Session) -> dict:
+    """Queue depth per status, age of the oldest due message and this process's delivery counters."""
+    counts = dict(db.query(OutboxMessage.status, func.count(OutboxMessage.id)).group_by(OutboxMessage.status).all())
+    oldest = (
+        db.query(func.min(OutboxMessage.created_at))
+        .filter(OutboxMessage.status == PENDING)
+        .scalar()
+    )
+    return {
+        "queue": {status: counts.get(status, 0) for status in (PENDING, SENT, DEAD)},
+        "oldest_pending_seconds": round((datetime.utcnow() - oldest).total_seconds(), 1) if oldest else None,
+        "dispatcher": metrics.snapshot(),
+    }
@@ -0,0 +1,92 @@
+# backend/services/pricing.py
+import time
+
+import numpy as np
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from backend.database import SessionLocal
+from backend.models import GoldRate, Product
+from backend.services.catalog import mark_changed
+from backend.services.logger import logger
+
+UPDATE_BATCH_SIZE = 5000
+MAX_KARAT = 24
+
+
+def latest_gram_rates(db: Session) -> dict[int, float]:
+    """Newest price_per_gram for every karat that has a rate."""
+    newest = (
+        db.query(GoldRate.karat, func.max(GoldRate.id).label("id"))
+        .group_by(GoldRate.karat)
+        .subquery()
+    )
+    rows = db.query(GoldRate.karat, GoldRate.price_per_gram).join(newest, GoldRate.id == newest.c.id).all()
+    return {karat: price for karat, price in rows}
+
+
+def _rate_table(gram_rates: dict[int, float]) -> np.ndarray:
+    """
+    Per-gram price indexed by karat. Karats without their own rate are
+    derived from 24K by purity; NaN where neither is known.
+    """
+    table = np.full(MAX_KARAT + 1, np.nan)
+    if MAX_KARAT in gram_rates:
+        table[:] = gram_rates[MAX_KARAT] / MAX_KARAT * np.arange(MAX_KARAT + 1)
+    for karat, price in gram_rates.items():
+        if 0 <= karat <= MAX_KARAT:
+            table[karat] = price
+    return table
+
+
+def reprice_catalog(db: Session, gram_rates: dict[int, float]) -> dict:
+    """
+    Recompute the metal price (rate per gram x weight) of every gold product
+    in one vectorised pass and write back only the rows whose price moved.
+    making_charge stays separate because checkout adds it on top of price.
+    """
+    started = time.perf_counter()
+    rows = (
+        db.query(Product.id, Product.karat, Product.weight_grams, Product.price)
+        .filter(func.lower(Product.metal_type) == "gold")
+        .all()
+    )
+    stats = {"products": len(rows), "changed": 0, "seconds": 0.0}
+    if not rows or not gram_rates:
+        return stats
+
+    ids, karats, weights, prices = (np.array(column) for column in zip(*rows))
+    karats = np.clip(np.nan_to_num(karats.astype(float), nan=MAX_KARAT), 0, MAX_KARAT).astype(int)
+    weights = np.nan_to_num(weights.astype(float))
+    prices = np.nan_to_num(prices.astype(float))
+
+    new_prices = np.round(_rate_table(gram_rates)[karats] * weights, 2)
+    changed = ~np.isnan(new_prices) & (np.abs(new_prices - prices) >= 0.01)
+
+    changed_ids, changed_prices = ids[changed].tolist(), new_prices[changed].tolist()
+    for start in range(0, len(changed_ids), UPDATE_BATCH_SIZE):
+        db.bulk_update_mappings(Product, [
+            {"id": pid, "price": price}
+            for pid, price in zip(changed_ids[start:start + UPDATE_BATCH_SIZE],
+                                  changed_prices[start:start + UPDATE_BATCH_SIZE])
+        ])
+    mark_changed(db, changed_ids)
+    db.commit()
+
+    stats["changed"] = len(changed_ids)
+    stats["seconds"] = round(time.perf_counter() - started, 3)
+    return stats
+
+
+def reprice_catalog_job():
+    """Background entry point run after a new gold rate is stored."""
+    db = SessionLocal()
+    try:
+        stats = reprice_catalog(db, latest_gram_rates(db))
+    except Exception:
+        db.rollback()
+        logger.exception("Catalog repricing failed")
+        return
+    finally:
+        db.close()
+    logger.info(f"Repriced catalog: {stats['changed']}/{stats['products']} products changed in {stats['seconds']}s")
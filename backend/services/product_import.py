@@ -0,0 +1,151 @@
+# backend/services/product_import.py
+import csv
+import io
+import json
+import time
+from typing import IO, Iterator
+
+from pydantic import ValidationError
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from backend.models import Product
+from backend.schemas import ProductCreate, ProductUpdate
+from backend.services import stock_ledger
+from backend.services.catalog import mark_changed
+
+MAX_REPORTED_ERRORS = 1000
+
+
+def iter_rows(stream: IO[bytes], fmt: str) -> Iterator[tuple[int, dict | None, str | None]]:
+    """
+    Yield (row number, raw row, parse error) one row at a time so the upload
+    is never held in memory. Empty CSV cells are dropped so schema defaults apply.
+    """
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    if fmt == "csv":
+        for number, row in enumerate(csv.DictReader(text), start=1):
+            yield number, {k.strip(): v for k, v in row.items() if k and v not in ("", None)}, None
+        return
+
+    for number, line in enumerate(text, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield number, None, f"Invalid JSON: {e.msg}"
+            continue
+        if not isinstance(row, dict):
+            yield number, None, "Each line must be a JSON object"
+            continue
+        yield number, row, None
+
+
+def _errors(e: ValidationError) -> str:
+    return "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors())
+
+
+def _write_batch(db: Session, batch: list[tuple[int, dict]], fail) -> tuple[int, int]:
+    """
+    Upsert one batch on sku in a single transaction. Rows matching an existing
+    sku only touch the columns present in the file; every other row must be a
+    complete ProductCreate. Stock changes are written to the ledger.
+    Returns (inserted, updated).
+    """
+    by_sku, new_rows = {}, []
+    for number, raw in batch:
+        if raw.get("sku"):
+            by_sku[str(raw["sku"])] = (number, raw)  # a sku repeated within the batch: last row wins
+        else:
+            new_rows.append((number, raw))
+
+    existing = {}
+    if by_sku:
+        rows = (
+            db.query(Product.sku, Product.id, Product.stock_quantity)
+            .filter(Product.sku.in_(list(by_sku)))
+            .order_by(Product.id)
+            .with_for_update()
+        )
+        existing = {sku: (product_id, stock) for sku, product_id, stock in rows}
+
+    updates, movements = [], []
+    for sku, (number, raw) in by_sku.items():
+        if sku not in existing:
+            new_rows.append((number, raw))
+            continue
+        try:
+            data = ProductUpdate.model_validate(raw).model_dump(exclude_unset=True)
+        except ValidationError as e:
+            fail(number, _errors(e))
+            continue
+        product_id, stock = existing[sku]
+        updates.append({"id": product_id, **data})
+        if data.get("stock_quantity") is not None and data["stock_quantity"] != stock:
+            movements.append({"product_id": product_id, "delta": data["stock_quantity"] - stock,
+                              "reason": stock_ledger.IMPORT})
+
+    inserts = []
+    for number, raw in new_rows:
+        try:
+            inserts.append(ProductCreate.model_validate(raw).model_dump())
+        except ValidationError as e:
+            fail(number, _errors(e))
+
+    if inserts:
+        # ids are needed for the ledger rows of stocked products
+        db.bulk_insert_mappings(Product, inserts, return_defaults=True)
+        movements += [
+            {"product_id": data["id"], "delta": data["stock_quantity"], "reason": stock_ledger.IMPORT}
+            for data in inserts if data["stock_quantity"]
+        ]
+    if updates:
+        db.bulk_update_mappings(Product, updates)
+    stock_ledger.record_many(db, movements)
+    mark_changed(db, [data["id"] for data in inserts + updates])
+    db.commit()
+    return len(inserts), len(updates)
+
+
+def import_products(db: Session, rows: Iterator[tuple[int, dict | None, str | None]], batch_size: int) -> dict:
+    started = time.perf_counter()
+    report = {"rows": 0, "inserted": 0, "updated": 0, "failed": 0, "errors": []}
+
+    def fail(number: int, error: str):
+        report["failed"] += 1
+        if len(report["errors"]) < MAX_REPORTED_ERRORS:
+            report["errors"].append({"row": number, "error": error})
+
+    def flush(batch):
+        rejected = []
+        try:
+            inserted, updated = _write_batch(db, batch, lambda number, error: rejected.append((number, error)))
+        except SQLAlchemyError as e:
+            db.rollback()
+            for number, _ in batch:
+                fail(number, f"Batch rejected by database: {e.__class__.__name__}")
+            return
+        for number, error in rejected:
+            fail(number, error)
+        report["inserted"] += inserted
+        report["updated"] += updated
+
+    batch: list[tuple[int, dict]] = []
+    for number, raw, error in rows:
+        report["rows"] += 1
+        if error:
+            fail(number, error)
+            continue
+        # validated in _write_batch, once it is known whether the row is an insert or an update
+        batch.append((number, raw))
+        if len(batch) >= batch_size:
+            flush(batch)
+            batch = []
+    if batch:
+        flush(batch)
+
+    elapsed = time.perf_counter() - started
+    report["elapsed_seconds"] = round(elapsed, 3)
+    report["rows_per_second"] = round(report["rows"] / elapsed, 1) if elapsed else None
+    return report
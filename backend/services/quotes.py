@@ -0,0 +1,57 @@
+# backend/services/quotes.py
+from datetime import datetime, timedelta
+
+from fastapi import HTTPException
+from jose import ExpiredSignatureError, JWTError, jwt
+from sqlalchemy.orm import Session
+
+from backend.configs import settings
+from backend.models import Product
+
+PURPOSE = "quote"
+
+
+def price_items(db: Session, wanted: dict[int, int]) -> dict[int, float]:
+    """Current unit price (gold price + making charge) for every wanted product, in one query."""
+    rows = (
+        db.query(Product.id, Product.price, Product.making_charge)
+        .filter(Product.id.in_(list(wanted)))
+        .all()
+    )
+    prices = {row.id: row.price + (row.making_charge or 0) for row in rows}
+    missing = [product_id for product_id in wanted if product_id not in prices]
+    if missing:
+        raise HTTPException(404, f"Product {missing[0]} not found")
+    return prices
+
+
+def issue(user_id: int, wanted: dict[int, int], prices: dict[int, float]) -> tuple[str, datetime]:
+    """
+    Sign the priced cart. The token has no "sub" claim on purpose, so it can
+    never pass as an access token, and access tokens fail the purpose check.
+    """
+    expires_at = datetime.utcnow() + timedelta(minutes=settings.QUOTE_TTL_MINUTES)
+    claims = {
+        "purpose": PURPOSE,
+        "uid": user_id,
+        "items": [[product_id, quantity, prices[product_id]] for product_id, quantity in sorted(wanted.items())],
+        "exp": expires_at,
+    }
+    return jwt.encode(claims, settings.JWT_SECRET, algorithm=settings.JWT_ALGORITHM), expires_at
+
+
+def verify(token: str, user_id: int, wanted: dict[int, int]) -> dict[int, float]:
+    """Check a quote against the order being placed and return its locked unit prices."""
+    try:
+        claims = jwt.decode(token, settings.JWT_SECRET, algorithms=[settings.JWT_ALGORITHM])
+    except ExpiredSignatureError:
+        raise HTTPException(409, "Quote has expired, please request a new one")
+    except JWTError:
+        raise HTTPException(400, "Invalid quote")
+    if claims.get("purpose") != PURPOSE or claims.get("uid") != user_id:
+        raise HTTPException(400, "Invalid quote")
+
+    quoted = {product_id: (quantity, unit_price) for product_id, quantity, unit_price in claims["items"]}
+    if {product_id: quantity for product_id, (quantity, _) in quoted.items()} != dict(wanted):
+        raise HTTPException(400, "Order items don't match the quote")
+    return {product_id: unit_price for product_id, (_, unit_price) in quoted.items()}
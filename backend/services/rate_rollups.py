@@ -0,0 +1,182 @@
+# backend/services/rate_rollups.py
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, select, tuple_
+from sqlalchemy.orm import Session
+
+from backend.configs import settings
+from backend.database import SessionLocal
+from backend.models import GoldRate, GoldRateRollup
+from backend.services.logger import logger
+
+COMPACT_BATCH_SIZE = 5000
+RESOLUTIONS = ("minute", "hour", "day")
+# how long each resolution is kept; day buckets are kept for good
+ROLLUP_RETENTION_DAYS = {"minute": 7, "hour": 365}
+# default window for a series request that gives no `from`
+DEFAULT_SPAN = {"minute": timedelta(days=1), "hour": timedelta(days=30), "day": timedelta(days=365)}
+MAX_SERIES_POINTS = 2000
+
+
+def bucket_start(at: datetime, resolution: str) -> datetime:
+    if resolution == "minute":
+        return at.replace(second=0, microsecond=0)
+    if resolution == "hour":
+        return at.replace(minute=0, second=0, microsecond=0)
+    if resolution == "day":
+        return at.replace(hour=0, minute=0, second=0, microsecond=0)
+    raise ValueError(f"Unknown resolution {resolution}")
+
+
+def fold(db: Session, ticks: list[GoldRate], resolutions: tuple[str, ...]) -> int:
+    """
+    Fold gold_rates rows into OHLC buckets at the given resolutions. Touched
+    buckets are loaded in one query and new ones added to the session; the
+    caller commits. Each bucket records the id range it has counted: newer
+    ticks extend it at the close, older ones (rows stored before the bucket
+    was first folded on arrival) extend it at the open, and ids inside the
+    range are skipped, so folding the same ticks twice is harmless. Returns
+    the number of buckets touched.
+    """
+    ticks = sorted(ticks, key=lambda tick: tick.id)
+    keys = {(tick.karat, resolution, bucket_start(tick.created_at, resolution))
+            for tick in ticks for resolution in resolutions}
+    if not keys:
+        return 0
+    buckets = {
+        (b.karat, b.resolution, b.bucket_start): b
+        for b in db.query(GoldRateRollup).filter(
+            tuple_(GoldRateRollup.karat, GoldRateRollup.resolution, GoldRateRollup.bucket_start).in_(list(keys))
+        )
+    }
+    earlier = defaultdict(list)
+    for tick in ticks:
+        price = tick.price_per_tola
+        for resolution in resolutions:
+            key = (tick.karat, resolution, bucket_start(tick.created_at, resolution))
+            bucket = buckets.get(key)
+            if bucket is None:
+                bucket = buckets[key] = GoldRateRollup(
+                    karat=tick.karat, resolution=resolution, bucket_start=key[2], open=price, high=price,
+                    low=price, close=price, tick_count=0, first_tick_id=tick.id, last_tick_id=tick.id,
+                )
+                db.add(bucket)
+            elif tick.id < bucket.first_tick_id:
+                earlier[key].append(tick)
+                continue
+            elif tick.id <= bucket.last_tick_id:
+                continue
+            bucket.high = max(bucket.high, price)
+            bucket.low = min(bucket.low, price)
+            bucket.close = price
+            bucket.tick_count += 1
+            bucket.last_tick_id = tick.id
+
+    # newest first, so the oldest tick ends up as the open
+    for key, older in earlier.items():
+        bucket = buckets[key]
+        for tick in reversed(older):
+            bucket.high = max(bucket.high, tick.price_per_tola)
+            bucket.low = min(bucket.low, tick.price_per_tola)
+            bucket.open = tick.price_per_tola
+            bucket.tick_count += 1
+            bucket.first_tick_id = tick.id
+    return len(keys)
+
+
+def backfill(db: Session, resolutions: tuple[str, ...] = RESOLUTIONS) -> int:
+    """
+    Fold every stored gold_rates row into the rollups, one committed batch at
+    a time (a one-off for rows stored before rollups existed). Safe to re-run.
+    Returns the number of rows read.
+    """
+    folded, after_id = 0, 0
+    while True:
+        ticks = (
+            db.query(GoldRate)
+            .filter(GoldRate.id > after_id)
+            .order_by(GoldRate.id)
+            .limit(COMPACT_BATCH_SIZE)
+            .all()
+        )
+        if not ticks:
+            return folded
+        fold(db, ticks, resolutions)
+        db.commit()
+        folded += len(ticks)
+        after_id = ticks[-1].id
+
+
+def compact_old_rates(db: Session, older_than: datetime) -> int:
+    """
+    Fold raw ticks older than `older_than` into day buckets (a no-op for
+    ticks already folded on arrival, merged for older rows) and delete them,
+    one committed batch at a time. The newest row of each karat is kept
+    because it is still the current rate when prices haven't moved.
+    """
+    keep = select(func.max(GoldRate.id)).group_by(GoldRate.karat)
+    removed = 0
+    while True:
+        ticks = (
+            db.query(GoldRate)
+            .filter(GoldRate.created_at < older_than, GoldRate.id.not_in(keep))
+            .order_by(GoldRate.id)
+            .limit(COMPACT_BATCH_SIZE)
+            .all()
+        )
+        if not ticks:
+            return removed
+        fold(db, ticks, ("day",))
+        db.query(GoldRate).filter(GoldRate.id.in_([tick.id for tick in ticks])).delete(synchronize_session=False)
+        db.commit()
+        removed += len(ticks)
+        if len(ticks) < COMPACT_BATCH_SIZE:
+            return removed
+
+
+def prune_rollups(db: Session, now: datetime) -> int:
+    """Drop fine-grained buckets past their retention, in committed batches."""
+    pruned = 0
+    for resolution, days in ROLLUP_RETENTION_DAYS.items():
+        while True:
+            ids = [
+                row.id for row in db.query(GoldRateRollup.id)
+                .filter(GoldRateRollup.resolution == resolution,
+                        GoldRateRollup.bucket_start < now - timedelta(days=days))
+                .limit(COMPACT_BATCH_SIZE)
+            ]
+            if not ids:
+                break
+            db.query(GoldRateRollup).filter(GoldRateRollup.id.in_(ids)).delete(synchronize_session=False)
+            db.commit()
+            pruned += len(ids)
+    return pruned
+
+
+def series(db: Session, karat: int, resolution: str, start: datetime, end: datetime) -> list[GoldRateRollup]:
+    """Buckets for one karat in [start, end), oldest first: a seek on the (karat, resolution, bucket_start) key."""
+    return (
+        db.query(GoldRateRollup)
+        .filter(
+            GoldRateRollup.karat == karat,
+            GoldRateRollup.resolution == resolution,
+            GoldRateRollup.bucket_start >= bucket_start(start, resolution),
+            GoldRateRollup.bucket_start < end,
+        )
+        .order_by(GoldRateRollup.bucket_start)
+        .limit(MAX_SERIES_POINTS)
+        .all()
+    )
+
+
+def compact_old_rates_job():
+    db = SessionLocal()
+    now = datetime.utcnow()
+    try:
+        removed = compact_old_rates(db, now - timedelta(days=settings.GOLD_RATE_RETENTION_DAYS))
+        pruned = prune_rollups(db, now)
+    finally:
+        db.close()
+    if removed or pruned:
+        logger.info(f"Compacted {removed} old gold rate ticks into daily rollups, pruned {pruned} expired buckets")
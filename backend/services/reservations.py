@@ -0,0 +1,129 @@
+# backend/services/reservations.py
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from fastapi import HTTPException
+from sqlalchemy import case, update
+from sqlalchemy.orm import Session
+
+from backend.configs import settings
+from backend.database import SessionLocal
+from backend.models import Product, StockReservation
+from backend.reprossitories import product_repo
+from backend.services.catalog import bump_version
+
+SWEEP_BATCH_SIZE = 500
+
+# Lock order everywhere: product rows first, then reservation rows. Product.reserved_quantity
+# always equals the sum of the product's unswept holds, so available stock is one column
+# subtraction instead of a SUM over holds.
+
+
+def _user_holds(db: Session, user_id: int, product_ids) -> dict[int, StockReservation]:
+    rows = (
+        db.query(StockReservation)
+        .filter(StockReservation.user_id == user_id, StockReservation.product_id.in_(list(product_ids)))
+        .with_for_update()
+        .all()
+    )
+    return {hold.product_id: hold for hold in rows}
+
+
+def hold(db: Session, user_id: int, product_id: int, quantity: int) -> StockReservation | None:
+    """
+    Set the user's hold on a product to `quantity` for another TTL period
+    (0 releases it). Raises 404/409 when the product is missing or the extra
+    units are not available. Bumps the catalog version, since available stock
+    shows in list, search and facet responses; the caller commits.
+    """
+    product = product_repo.lock_products(db, [product_id]).get(product_id)
+    if not product:
+        raise HTTPException(404, "Product not found")
+    existing = _user_holds(db, user_id, [product_id]).get(product_id)
+    own = existing.quantity if existing else 0
+
+    if quantity - own > product.available_quantity:
+        raise HTTPException(409, f"Only {product.available_quantity + own} of {product.name} available")
+
+    product.reserved_quantity += quantity - own
+    expires_at = datetime.utcnow() + timedelta(minutes=settings.RESERVATION_TTL_MINUTES)
+    if quantity <= 0:
+        if existing:
+            db.delete(existing)
+        reservation = None
+    elif existing:
+        existing.quantity = quantity
+        existing.expires_at = expires_at
+        reservation = existing
+    else:
+        reservation = StockReservation(user_id=user_id, product_id=product_id, quantity=quantity, expires_at=expires_at)
+        db.add(reservation)
+    if quantity != own:
+        bump_version(db)
+    return reservation
+
+
+def release(db: Session, user_id: int, product_id: int):
+    hold(db, user_id, product_id, 0)
+
+
+def consume(db: Session, user_id: int, products: dict[int, Product]):
+    """
+    Turn the user's holds on already-locked `products` back into free stock
+    so the order can take it; the caller then decrements stock_quantity in
+    the same transaction and calls mark_changed for the products, which also
+    covers the freed holds.
+    """
+    for product_id, reservation in _user_holds(db, user_id, products).items():
+        products[product_id].reserved_quantity -= reservation.quantity
+        db.delete(reservation)
+
+
+def sweep_expired(db: Session, now: datetime | None = None) -> int:
+    """Release holds past their expiry in batches. Returns how many were released."""
+    now = now or datetime.utcnow()
+    released = 0
+    while True:
+        candidates = (
+            db.query(StockReservation.id, StockReservation.product_id)
+            .filter(StockReservation.expires_at <= now)
+            .order_by(StockReservation.expires_at)
+            .limit(SWEEP_BATCH_SIZE)
+            .all()
+        )
+        if not candidates:
+            return released
+
+        product_repo.lock_products(db, {product_id for _, product_id in candidates})
+        # re-read under lock: a hold renewed meanwhile is no longer expired
+        expired = (
+            db.query(StockReservation)
+            .filter(StockReservation.id.in_([rid for rid, _ in candidates]), StockReservation.expires_at <= now)
+            .with_for_update()
+            .all()
+        )
+        freed: dict[int, int] = defaultdict(int)
+        for reservation in expired:
+            freed[reservation.product_id] += reservation.quantity
+            db.delete(reservation)
+        if freed:
+            db.execute(
+                update(Product)
+                .where(Product.id.in_(list(freed)))
+                .values(reserved_quantity=Product.reserved_quantity - case(freed, value=Product.id, else_=0))
+                .execution_options(synchronize_session=False)
+            )
+            # available stock moved for list, search and facets; detail ETags carry reserved_quantity
+            bump_version(db)
+        db.commit()
+        released += len(expired)
+        if len(candidates) < SWEEP_BATCH_SIZE:
+            return released
+
+
+def sweep_expired_job():
+    db = SessionLocal()
+    try:
+        sweep_expired(db)
+    finally:
+        db.close()
@@ -0,0 +1,92 @@
+# backend/services/scheduler.py
+import random
+import threading
+from datetime import datetime, timedelta
+
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
+
+from backend.database import SessionLocal
+from backend.models import JobRun
+from backend.services.logger import logger
+
+MAX_START_JITTER_SECONDS = 30  # spreads first runs so workers starting together don't collide
+
+
+class PeriodicJob:
+    """
+    Runs `func` on a daemon thread until stopped: once shortly after start
+    (after a small random delay), then every `interval` seconds. Long-interval
+    jobs therefore still run when the app restarts more often than they fire.
+    """
+
+    def __init__(self, name: str, interval: float, func):
+        self.name = name
+        self.interval = interval
+        self.func = func
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def _run(self):
+        delay = random.uniform(0, min(self.interval, MAX_START_JITTER_SECONDS))
+        while not self._stop.wait(delay):
+            try:
+                self.func()
+            except Exception:
+                logger.exception(f"Scheduled job {self.name} failed")
+            delay = self.interval
+
+
+_jobs: list[PeriodicJob] = []
+
+
+def register(name: str, interval: float, func):
+    _jobs.append(PeriodicJob(name, interval, func))
+
+
+def start():
+    for job in _jobs:
+        job.start()
+
+
+def stop():
+    for job in _jobs:
+        job.stop()
+
+
+def claim_run(name: str, interval: float) -> bool:
+    """
+    Every worker process registers the same jobs. A job that must run once
+    per interval across all of them calls this first: it returns True for the
+    one caller that gets to run now, and False while any process has already
+    run it within `interval` seconds (less the start jitter).
+    """
+    now = datetime.utcnow()
+    due = now - timedelta(seconds=max(interval - MAX_START_JITTER_SECONDS, 0))
+    db = SessionLocal()
+    try:
+        claimed = db.execute(
+            update(JobRun).where(JobRun.name == name, JobRun.last_run_at <= due).values(last_run_at=now)
+        ).rowcount
+        if not claimed:
+            if db.get(JobRun, name) is not None:
+                db.rollback()
+                return False
+            db.add(JobRun(name=name, last_run_at=now))  # first run ever
+        db.commit()
+        return True
+    except IntegrityError:
+        db.rollback()  # another process recorded the first run at the same moment
+        return False
+    finally:
+        db.close()
@@ -0,0 +1,277 @@
+# backend/services/search.py
+import heapq
+import math
+import re
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from backend.models import Product
+
+# Matches in the name count more than matches buried in the description
+FIELD_WEIGHTS = {
+    "name": 3.0,
+    "category": 2.0,
+    "metal_type": 2.0,
+    "description": 1.0,
+}
+PREFIX_WEIGHT = 0.8        # "neck" -> "necklace" while the customer is still typing
+FUZZY_WEIGHT = 0.5         # one typo: "neckalce" -> "necklace"
+MAX_PREFIX_EXPANSIONS = 50
+MIN_FUZZY_LENGTH = 4       # short tokens produce too many false friends
+# catalog filters answered from the index, before hits are ranked and capped
+ATTRIBUTES = ("metal_type", "karat", "category")
+REFRESH_SECONDS = 1.0      # how often a search checks the database for product changes
+LOAD_BATCH_SIZE = 5000     # rows per fetch when (re)loading, and products swapped in per lock hold
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str | None) -> list[str]:
+    if not text:
+        return []
+    return _TOKEN_RE.findall(text.lower())
+
+
+def _deletes(term: str) -> set[str]:
+    """All strings one deletion away from term (SymSpell-style candidates)."""
+    return {term[:i] + term[i + 1:] for i in range(len(term))}
+
+
+def _fold(value):
+    return value.casefold() if isinstance(value, str) else value
+
+
+def _document(doc) -> tuple[dict[str, float], tuple, int]:
+    """Term weights and filter attributes of a product, plus a fingerprint of both."""
+    weights: dict[str, float] = defaultdict(float)
+    for field, weight in FIELD_WEIGHTS.items():
+        for term in tokenize(getattr(doc, field, None)):
+            weights[term] += weight
+    attributes = tuple(_fold(getattr(doc, name, None)) for name in ATTRIBUTES)
+    return weights, attributes, hash((tuple(sorted(weights.items())), attributes))
+
+
+class ProductSearchIndex:
+    """
+    In-process inverted index over product name, description, category and
+    metal. Built from the database on first use; after that, products whose
+    version moved past the newest one indexed (changed by any process) are
+    re-read, checked at most every REFRESH_SECONDS. Version bumps that leave
+    the indexed fields alone (a reprice, a stock change) re-read the row but
+    don't touch the index, and the read itself happens outside the lock
+    searches take.
+
+    Queries are tokenised the same way as documents; every query token must
+    match (exactly, by prefix for the last token, or within one edit) and
+    results are ranked by field-weighted tf-idf. Metal, karat and category are
+    kept per product so hits can be narrowed by them before ranking.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._refresh_lock = threading.Lock()  # one refresh at a time; searches never wait on it
+        self._loaded = False
+        self._version = 0          # highest Product.version indexed
+        self._checked_at = 0.0
+        self._postings: dict[str, dict[int, float]] = defaultdict(dict)
+        self._doc_terms: dict[int, set[str]] = {}
+        self._attributes: dict[int, tuple] = {}
+        self._fingerprints: dict[int, int] = {}  # what each product was indexed from
+        self._deletes: dict[str, set[str]] = defaultdict(set)
+        self._sorted_terms: list[str] = []
+        self._terms_dirty = False
+
+    # --- maintenance ---
+
+    def ensure_loaded(self, db: Session):
+        if self._loaded and time.monotonic() - self._checked_at < REFRESH_SECONDS:
+            return
+        if not self._loaded:
+            self._refresh_lock.acquire()   # nothing to search yet: wait for the build
+        elif not self._refresh_lock.acquire(blocking=False):
+            return                         # another thread is refreshing; serve the current index
+        try:
+            if not self._loaded:
+                self._load(db, since=None)
+                self._loaded = True
+            elif time.monotonic() - self._checked_at >= REFRESH_SECONDS:
+                newest = db.query(func.max(Product.version)).scalar() or 0
+                if newest > self._version:
+                    self._load(db, since=self._version)
+            self._checked_at = time.monotonic()
+        finally:
+            self._refresh_lock.release()
+
+    def _load(self, db: Session, since: int | None):
+        """
+        Index every product, or only those changed after version `since`. Rows
+        are read and tokenised without holding the index lock; only products
+        whose indexed fields differ are then swapped in, a batch per lock hold.
+        """
+        # read the marker first: a write landing mid-scan is simply picked up again next time
+        newest = db.query(func.max(Product.version)).scalar() or 0
+        q = db.query(Product.id, Product.name, Product.description, Product.category, Product.metal_type, Product.karat)
+        if since is not None:
+            q = q.filter(Product.version > since)
+        changed = []
+        for row in q.yield_per(LOAD_BATCH_SIZE):
+            weights, attributes, fingerprint = _document(row)
+            if self._fingerprints.get(row.id) != fingerprint:
+                changed.append((row.id, weights, attributes, fingerprint))
+        for start in range(0, len(changed), LOAD_BATCH_SIZE):
+            with self._lock:
+                for document in changed[start:start + LOAD_BATCH_SIZE]:
+                    self._remove(document[0])
+                    self._add(*document)
+        self._version = max(self._version, newest)
+
+    def upsert(self, product):
+        """Index a new or edited product. No-op until the index has been built."""
+        document = _document(product)
+        with self._lock:
+            if not self._loaded:
+                return
+            self._remove(product.id)
+            self._add(product.id, *document)
+
+    def reset(self):
+        """Forget everything; the next search rebuilds from the database (after bulk writes)."""
+        with self._lock:
+            self._loaded = False
+            self._version = 0
+            self._postings.clear()
+            self._doc_terms.clear()
+            self._attributes.clear()
+            self._fingerprints.clear()
+            self._deletes.clear()
+            self._sorted_terms = []
+            self._terms_dirty = False
+
+    def remove(self, product_id: int):
+        with self._lock:
+            self._remove(product_id)
+
+    def _add(self, product_id: int, weights: dict[str, float], attributes: tuple, fingerprint: int):
+        for term, weight in weights.items():
+            if term not in self._postings:
+                self._terms_dirty = True
+                if len(term) >= MIN_FUZZY_LENGTH:
+                    for variant in _deletes(term):
+                        self._deletes[variant].add(term)
+            self._postings[term][product_id] = weight
+        self._doc_terms[product_id] = set(weights)
+        self._attributes[product_id] = attributes
+        self._fingerprints[product_id] = fingerprint
+
+    def _remove(self, product_id: int):
+        self._attributes.pop(product_id, None)
+        self._fingerprints.pop(product_id, None)
+        for term in self._doc_terms.pop(product_id, ()):
+            postings = self._postings.get(term)
+            if postings is None:
+                continue
+            postings.pop(product_id, None)
+            if not postings:
+                del self._postings[term]
+                self._terms_dirty = True
+                for variant in _deletes(term):
+                    self._deletes.get(variant, set()).discard(term)
+
+    # --- querying ---
+
+    def _expand(self, token: str, is_last: bool) -> dict[str, float]:
+        """Index terms a query token can stand for, with a match-quality weight."""
+        expansions = {}
+        if token in self._postings:
+            expansions[token] = 1.0
+
+        if is_last:
+            if self._terms_dirty:
+                self._sorted_terms = sorted(self._postings)
+                self._terms_dirty = False
+            i = bisect_left(self._sorted_terms, token)
+            while i < len(self._sorted_terms) and len(expansions) < MAX_PREFIX_EXPANSIONS:
+                term = self._sorted_terms[i]
+                if not term.startswith(token):
+                    break
+                expansions.setdefault(term, PREFIX_WEIGHT)
+                i += 1
+
+        if not expansions and len(token) >= MIN_FUZZY_LENGTH:
+            candidates = set(self._deletes.get(token, ()))    # customer dropped a letter
+            for variant in _deletes(token):
+                if variant in self._postings:                 # customer typed an extra letter
+                    candidates.add(variant)
+                candidates |= self._deletes.get(variant, set())  # substitution / transposition
+            for term in candidates:
+                expansions[term] = FUZZY_WEIGHT
+        return expansions
+
+    def search(self, query: str, limit: int | None = None, where: dict | None = None) -> list[tuple[int, float]]:
+        """
+        Return (product_id, score) pairs, best match first. `where` maps
+        ATTRIBUTES to the value a hit must have (compared case-insensitively,
+        like the database collation); empty values are ignored.
+        """
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        with self._lock:
+            total_docs = max(len(self._doc_terms), 1)
+            # (term postings, quality * idf) for every term each token may stand for
+            alternatives = []
+            for position, token in enumerate(tokens):
+                terms = [
+                    (self._postings[term], quality * math.log(1 + total_docs / len(self._postings[term])))
+                    for term, quality in self._expand(token, position == len(tokens) - 1).items()
+                ]
+                if not terms:
+                    return []
+                alternatives.append(terms)
+
+            # Start from the most selective token and only probe surviving ids after that
+            alternatives.sort(key=lambda terms: sum(len(postings) for postings, _ in terms))
+            first_postings, first_factor = alternatives[0][0]
+            scores = {product_id: first_factor * weight for product_id, weight in first_postings.items()}
+            for postings, factor in alternatives[0][1:]:
+                for product_id, weight in postings.items():
+                    score = factor * weight
+                    if score > scores.get(product_id, 0.0):
+                        scores[product_id] = score
+            for terms in alternatives[1:]:
+                if len(terms) == 1:
+                    postings, factor = terms[0]
+                    scores = {pid: score + factor * postings[pid] for pid, score in scores.items() if pid in postings}
+                    if not scores:
+                        return []
+                    continue
+                for product_id in list(scores):
+                    best = max((factor * postings[product_id] for postings, factor in terms
+                                if product_id in postings), default=None)
+                    if best is None:
+                        del scores[product_id]
+                    else:
+                        scores[product_id] += best
+                if not scores:
+                    return []
+
+            wanted = [(i, _fold(value)) for i, name in enumerate(ATTRIBUTES)
+                      if (value := (where or {}).get(name))]
+            if wanted:
+                attributes = self._attributes
+                scores = {pid: score for pid, score in scores.items()
+                          if all(attributes[pid][i] == value for i, value in wanted)}
+
+        # (score, id) tuples compare in C, and ties fall back to the newest product
+        pairs = zip(scores.values(), scores.keys())
+        ranked = heapq.nlargest(limit, pairs) if limit else sorted(pairs, reverse=True)
+        return [(product_id, score) for score, product_id in ranked]
+
+
+# Shared instance used by the product routes
+search_index = ProductSearchIndex()
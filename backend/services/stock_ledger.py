@@ -0,0 +1,204 @@
+# backend/services/stock_ledger.py
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from sqlalchemy import case, exists, func, insert, literal, select, update
+from sqlalchemy.orm import Session, aliased
+
+from backend.configs import settings
+from backend.database import SessionLocal
+from backend.models import OrderItem, Product, StockMovement, StockSnapshot
+from backend.reprossitories import product_repo
+from backend.services import scheduler
+from backend.services.logger import logger
+from backend.utils.pagination import encode_cursor, decode_cursor
+
+# Movement reasons
+INITIAL = "initial"
+ADJUSTMENT = "adjustment"
+ORDER = "order"
+CANCELLATION = "cancellation"
+IMPORT = "import"
+
+ADJUST_BATCH_SIZE = 1000  # ids per CASE update
+PURGE_BATCH_SIZE = 1000
+
+
+def record(db: Session, product_id: int, delta: int, reason: str, reference_id: int | None = None):
+    """Append one movement to the session; it commits with the stock change it describes."""
+    db.add(StockMovement(product_id=product_id, delta=delta, reason=reason, reference_id=reference_id))
+
+
+def record_many(db: Session, movements: list[dict]):
+    """Append many movements ({product_id, delta, reason, reference_id}) with one INSERT."""
+    if movements:
+        now = datetime.utcnow()
+        db.execute(insert(StockMovement), [{"created_at": now, "reference_id": None, **m} for m in movements])
+
+
+def restock_orders(db: Session, order_ids: list[int], reason: str = CANCELLATION) -> list[int]:
+    """
+    Put the items of the given orders back on the shelf and log one movement
+    per (order, product). Locks the products; the caller commits. Returns the
+    product ids touched.
+    """
+    rows = (
+        db.query(OrderItem.order_id, OrderItem.product_id, func.sum(OrderItem.quantity))
+        .filter(OrderItem.order_id.in_(order_ids))
+        .group_by(OrderItem.order_id, OrderItem.product_id)
+        .all()
+    )
+    returned: dict[int, int] = defaultdict(int)
+    for _, product_id, quantity in rows:
+        returned[product_id] += quantity
+
+    products = product_repo.lock_products(db, returned)
+    for product_id, quantity in returned.items():
+        if product_id in products:
+            products[product_id].stock_quantity += quantity
+    record_many(db, [
+        {"product_id": product_id, "delta": int(quantity), "reason": reason, "reference_id": order_id}
+        for order_id, product_id, quantity in rows if product_id in products
+    ])
+    return list(products)
+
+
+def adjust_stock(db: Session, adjustments) -> tuple[bool, list[dict]]:
+    """
+    Apply a batch of StockAdjustment items (delta or absolute count) in the
+    caller's transaction. Products are locked once, every outcome is checked
+    up front, and only if none goes missing or negative are the new levels
+    written with CASE updates plus one ledger insert. Repeated products fold
+    in order. Returns (applied, per-item results); the caller commits or
+    rolls back.
+    """
+    products = product_repo.lock_products(db, {a.product_id for a in adjustments})
+    levels = {product_id: product.stock_quantity for product_id, product in products.items()}
+
+    results, ok = [], True
+    for adjustment in adjustments:
+        old = levels.get(adjustment.product_id)
+        if old is None:
+            results.append({"product_id": adjustment.product_id, "status": "not_found"})
+            ok = False
+            continue
+        new = adjustment.count if adjustment.count is not None else old + adjustment.delta
+        result = {"product_id": adjustment.product_id, "old_stock": old, "new_stock": new, "delta": new - old}
+        if new < 0:
+            result["status"] = "negative_stock"
+            ok = False
+        else:
+            result["status"] = "ok"
+            levels[adjustment.product_id] = new
+        results.append(result)
+    if not ok:
+        return False, results
+
+    changed = {pid: level for pid, level in levels.items() if level != products[pid].stock_quantity}
+    ids = list(changed)
+    for start in range(0, len(ids), ADJUST_BATCH_SIZE):
+        batch = {pid: changed[pid] for pid in ids[start:start + ADJUST_BATCH_SIZE]}
+        db.execute(
+            update(Product)
+            .where(Product.id.in_(list(batch)))
+            .values(stock_quantity=case(batch, value=Product.id))
+            .execution_options(synchronize_session=False)
+        )
+    record_many(db, [
+        {"product_id": r["product_id"], "delta": r["delta"], "reason": ADJUSTMENT}
+        for r in results if r["delta"]
+    ])
+    return True, results
+
+
+def take_snapshots(db: Session, now: datetime | None = None) -> int:
+    """
+    Copy the current stock of every product that had movements since the
+    last snapshot into stock_snapshots with one INSERT ... SELECT, stamped
+    with the newest movement id it already includes; for the others the
+    previous snapshot still holds. The watermark is read inside the same
+    statement so a movement committed between two reads can't be counted
+    twice or missed by stock_at.
+    """
+    now = now or datetime.utcnow()
+    previous = db.query(func.coalesce(func.max(StockSnapshot.movement_id), 0)).scalar()
+    watermark = select(func.coalesce(func.max(StockMovement.id), 0)).scalar_subquery()
+    moved = select(StockMovement.product_id).where(StockMovement.id > previous)
+    result = db.execute(
+        insert(StockSnapshot).from_select(
+            ["product_id", "quantity", "movement_id", "taken_at"],
+            select(Product.id, Product.stock_quantity, watermark, literal(now)).where(Product.id.in_(moved)),
+        )
+    )
+    db.commit()
+    return result.rowcount
+
+
+def purge_snapshots(db: Session, older_than: datetime) -> int:
+    """
+    Delete snapshots taken before `older_than` in small batches, keeping each
+    product's newest one: stock_at needs it while the product hasn't moved.
+    """
+    newer = aliased(StockSnapshot)
+    superseded = exists().where(newer.product_id == StockSnapshot.product_id, newer.taken_at > StockSnapshot.taken_at)
+    purged = 0
+    while True:
+        ids = [
+            row.id for row in db.query(StockSnapshot.id)
+            .filter(StockSnapshot.taken_at < older_than, superseded)
+            .limit(PURGE_BATCH_SIZE)
+        ]
+        if not ids:
+            return purged
+        db.query(StockSnapshot).filter(StockSnapshot.id.in_(ids)).delete(synchronize_session=False)
+        db.commit()
+        purged += len(ids)
+
+
+def take_snapshots_job():
+    # registered in every worker; only one of them snapshots per interval
+    if not scheduler.claim_run("stock-snapshots", settings.STOCK_SNAPSHOT_HOURS * 3600):
+        return
+    db = SessionLocal()
+    now = datetime.utcnow()
+    try:
+        count = take_snapshots(db, now)
+        purged = purge_snapshots(db, now - timedelta(days=settings.STOCK_SNAPSHOT_RETENTION_DAYS))
+    finally:
+        db.close()
+    logger.info(f"Stock snapshot taken for {count} products, {purged} old snapshots purged")
+
+
+def stock_at(db: Session, product: Product, at: datetime) -> int:
+    """
+    Stock level at a point in time: the newest snapshot taken at or before
+    `at` plus the movements logged after it, so only a bounded slice of the
+    ledger is summed. Without an earlier snapshot, rewind from the current
+    level instead.
+    """
+    snapshot = (
+        db.query(StockSnapshot)
+        .filter(StockSnapshot.product_id == product.id, StockSnapshot.taken_at <= at)
+        .order_by(StockSnapshot.taken_at.desc())
+        .first()
+    )
+    movements = db.query(func.coalesce(func.sum(StockMovement.delta), 0)).filter(StockMovement.product_id == product.id)
+    if snapshot:
+        return snapshot.quantity + movements.filter(
+            StockMovement.id > snapshot.movement_id, StockMovement.created_at <= at
+        ).scalar()
+    return product.stock_quantity - movements.filter(StockMovement.created_at > at).scalar()
+
+
+def history(db: Session, product_id: int, cursor: str | None, limit: int) -> tuple[list[StockMovement], str | None]:
+    """Newest-first page of a product's movements, seeking on (product_id, created_at, id)."""
+    q = db.query(StockMovement).filter(StockMovement.product_id == product_id)
+    if cursor:
+        created_at, movement_id = decode_cursor(cursor, "movements", 2)
+        q = q.filter(
+            StockMovement.created_at <= created_at,
+            (StockMovement.created_at < created_at) | (StockMovement.id < movement_id),
+        )
+    rows = q.order_by(StockMovement.created_at.desc(), StockMovement.id.desc()).limit(limit).all()
+    next_cursor = encode_cursor("movements", rows[-1].created_at, rows[-1].id) if len(rows) == limit else None
+    return rows, next_cursor
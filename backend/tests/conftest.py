@@ -0,0 +1,64 @@
+"""
+Shared fixtures: the app runs against an in-memory SQLite database, created
+empty for every test. Row locks are not exercised here (see scripts/bench_*
+for that); these tests cover routing, queries and responses.
+"""
+import os
+
+for name, value in {
+    "DATABASE_USER": "test", "DATABASE_PASSWORD": "test", "DATABASE_HOST": "localhost",
+    "DATABASE_PORT": "3306", "DATABASE_NAME": "test", "JWT_SECRET": "test", "JWT_ALGORITHM": "HS256",
+    "ACCESS_TOKEN_EXPIRE_MINUTES": "30", "GOLD_SCRAPER_URL": "http://127.0.0.1:9/", "TOLA_WEIGHT_GRAM": "11.6638",
+    "RATE_REFRESH_ENABLED": "false",
+}.items():
+    os.environ.setdefault(name, value)
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.pool import StaticPool
+
+from backend import database
+
+engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+database.engine = engine
+database.SessionLocal.configure(bind=engine)
+
+from backend.main import app  # noqa: E402  (after the engine swap: main runs create_all on import)
+from backend.models import User  # noqa: E402
+from backend.security import get_current_user  # noqa: E402
+from backend.services import cache  # noqa: E402
+from backend.services.search import search_index  # noqa: E402
+
+
+@pytest.fixture
+def db():
+    database.Base.metadata.create_all(bind=engine)
+    session = database.SessionLocal()
+    yield session
+    session.close()
+    database.Base.metadata.drop_all(bind=engine)
+    # ids and catalog versions restart with the next database, so in-process state must too
+    search_index.reset()
+    for stats in cache.cache_stats():
+        cache.invalidate(stats["name"])
+
+
+@pytest.fixture
+def client(db):
+    # not used as a context manager: the lifespan (scheduler, rate refresher) stays off
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def login(db):
+    """Authenticate later requests as a new user; admin=True for an admin."""
+    def _login(admin: bool = False) -> User:
+        user = User(name="Test", email=f"user{db.query(User).count() + 1}@example.com",
+                    hashed_password="x", is_admin=admin)
+        db.add(user)
+        db.commit()
+        app.dependency_overrides[get_current_user] = lambda: user
+        return user
+    return _login
@@ -0,0 +1,25 @@
+def test_cache_stats_requires_admin(client, login):
+    assert client.get("/admin/cache-stats").status_code == 401
+    login()
+    assert client.get("/admin/cache-stats").status_code == 403
+
+
+def test_cache_stats(client, login):
+    login(admin=True)
+    response = client.get("/admin/cache-stats")
+    assert response.status_code == 200
+    assert "product_detail" in {cache["name"] for cache in response.json()["caches"]}
+
+
+def test_outbox_stats(client, login):
+    login(admin=True)
+    response = client.get("/admin/outbox-stats")
+    assert response.status_code == 200
+    assert isinstance(response.json(), dict)
+
+
+def test_dashboard(client, login):
+    login(admin=True)
+    response = client.get("/admin/dashboard")
+    assert response.status_code == 200
+    assert response.json()["total_orders"] == 0
@@ -0,0 +1,44 @@
+from backend.models import Product
+
+
+def test_cart_holds_and_releases_stock(client, login, db):
+    login()
+    product = Product(name="Ring", metal_type="gold", karat=22, weight_grams=2, price=1000, stock_quantity=3)
+    db.add(product)
+    db.commit()
+
+    item = client.post("/api/cart/", json={"product_id": product.id, "quantity": 2})
+    assert item.status_code == 200
+    assert client.get(f"/products/{product.id}").json()["available_quantity"] == 1
+    assert client.post("/api/cart/", json={"product_id": product.id, "quantity": 2}).status_code == 409
+
+    assert client.delete(f"/api/cart/{item.json()['id']}").status_code == 200
+    assert client.get(f"/products/{product.id}").json()["available_quantity"] == 3
+
+
+def test_cart_hold_refreshes_list_etag(client, login, db):
+    login()
+    product = Product(name="Ring", metal_type="gold", karat=22, weight_grams=2, price=1000, stock_quantity=3)
+    db.add(product)
+    db.commit()
+
+    before = client.get("/products/")
+    assert client.post("/api/cart/", json={"product_id": product.id, "quantity": 2}).status_code == 200
+    after = client.get("/products/", headers={"If-None-Match": before.headers["ETag"]})
+    assert after.status_code == 200
+    assert after.json()[0]["available_quantity"] == 1
+
+
+def test_cart_holds_show_in_facets_and_search(client, login, db):
+    login()
+    product = Product(name="Ring", metal_type="gold", karat=22, weight_grams=2, price=1000, stock_quantity=2)
+    db.add(product)
+    db.commit()
+
+    assert client.get("/products/facets", params={"query": "ring"}).json()["in_stock"] == {"true": 1, "false": 0}
+    assert client.post("/api/cart/", json={"product_id": product.id, "quantity": 2}).status_code == 200
+
+    facets = client.get("/products/facets", params={"query": "ring"}).json()
+    assert facets["in_stock"] == {"true": 0, "false": 1}
+    assert client.get("/products/search", params={"query": "ring", "in_stock": True}).json() == []
+    assert client.get("/products/facets", params={"query": "ring", "in_stock": True}).json()["total"] == 0
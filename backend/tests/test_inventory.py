@@ -0,0 +1,30 @@
+from backend.models import Product, StockMovement
+
+
+def test_bulk_stock_adjustment_is_all_or_nothing(client, login, db):
+    login(admin=True)
+    ring = Product(name="Ring", metal_type="gold", karat=22, weight_grams=2, price=1000, stock_quantity=5)
+    chain = Product(name="Chain", metal_type="gold", karat=22, weight_grams=8, price=4000, stock_quantity=1)
+    db.add_all([ring, chain])
+    db.commit()
+
+    response = client.post("/inventory/stock/bulk", json={"items": [
+        {"product_id": ring.id, "delta": 3},
+        {"product_id": chain.id, "delta": -2},
+        {"product_id": 999, "count": 4},
+    ]})
+    assert response.status_code == 400
+    assert response.json()["detail"]["message"] == "No stock was changed"
+    db.refresh(ring)
+    db.refresh(chain)
+    assert (ring.stock_quantity, chain.stock_quantity) == (5, 1)
+    assert db.query(StockMovement).count() == 0
+
+    response = client.post("/inventory/stock/bulk", json={"items": [
+        {"product_id": ring.id, "delta": 3},
+        {"product_id": chain.id, "count": 0},
+    ]})
+    assert response.status_code == 200
+    db.refresh(ring)
+    db.refresh(chain)
+    assert (ring.stock_quantity, chain.stock_quantity) == (8, 0)
@@ -0,0 +1,62 @@
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+from sqlalchemy import event
+
+from backend.models import Order, OrderItem, Product
+from backend.tests.conftest import engine
+
+
+@contextmanager
+def count_queries():
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+
+def place_orders(db, user, count: int, lines: int = 3):
+    product = Product(name="Ring", metal_type="gold", karat=22, weight_grams=2, price=1000, stock_quantity=0)
+    db.add(product)
+    db.flush()
+    start = datetime(2026, 1, 1)
+    for n in range(count):
+        order = Order(user_id=user.id, total_price=lines * 1000, placed_at=start + timedelta(hours=n))
+        db.add(order)
+        db.flush()
+        db.add_all([OrderItem(order_id=order.id, product_id=product.id, quantity=1, unit_price=1000,
+                              total_price=1000) for _ in range(lines)])
+    db.commit()
+
+
+def test_order_history_loads_lines_without_n_plus_one(client, login, db):
+    place_orders(db, login(), count=30)
+    client.get("/orders/me")  # warm-up: the test user's row is reloaded once after the commit above
+
+    with count_queries() as small_page:
+        few = client.get("/orders/me", params={"limit": 5})
+    with count_queries() as large_page:
+        many = client.get("/orders/me", params={"limit": 25})
+
+    assert few.status_code == many.status_code == 200
+    assert len(many.json()) == 25
+    assert all(len(order["items"]) == 3 for order in many.json())
+    # one query for the page of orders and one for all of their lines, whatever the page size
+    assert len(small_page) == len(large_page) == 2
+
+
+def test_order_history_cursor_pages_do_not_overlap(client, login, db):
+    place_orders(db, login(), count=7, lines=1)
+
+    first = client.get("/orders/me", params={"limit": 4, "summary": True})
+    second = client.get("/orders/me", params={"limit": 4, "summary": True,
+                                              "cursor": first.headers["X-Next-Cursor"]})
+
+    ids = [order["id"] for order in first.json() + second.json()]
+    assert ids == sorted(ids, reverse=True) and len(set(ids)) == 7
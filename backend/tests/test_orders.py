@@ -0,0 +1,49 @@
+from backend.models import Order, OutboxMessage, Product
+
+
+def add_ring(db, stock: int = 5) -> Product:
+    product = Product(name="Ring", metal_type="gold", karat=22, weight_grams=2, price=1000, stock_quantity=stock)
+    db.add(product)
+    db.commit()
+    return product
+
+
+def test_idempotency_key_replays_the_order(client, login, db):
+    user = login()
+    product = add_ring(db)
+    body = {"user_id": user.id, "items": [{"product_id": product.id, "quantity": 2}]}
+
+    first = client.post("/orders/", json=body, headers={"Idempotency-Key": "checkout-1"})
+    again = client.post("/orders/", json=body, headers={"Idempotency-Key": "checkout-1"})
+    assert first.status_code == again.status_code == 200
+    assert again.headers["Idempotent-Replayed"] == "true"
+    assert again.json() == first.json()
+    assert db.query(Order).count() == 1
+    assert db.query(OutboxMessage).count() == 1
+    db.refresh(product)
+    assert product.stock_quantity == 3
+
+
+def test_idempotency_key_with_another_body_is_rejected(client, login, db):
+    user = login()
+    product = add_ring(db)
+    body = {"user_id": user.id, "items": [{"product_id": product.id, "quantity": 1}]}
+    assert client.post("/orders/", json=body, headers={"Idempotency-Key": "checkout-1"}).status_code == 200
+
+    body["items"][0]["quantity"] = 2
+    assert client.post("/orders/", json=body, headers={"Idempotency-Key": "checkout-1"}).status_code == 422
+    assert db.query(Order).count() == 1
+
+
+def test_illegal_status_transition_is_a_conflict(client, login, db):
+    user = login(admin=True)
+    product = add_ring(db)
+    order = client.post("/orders/", json={"user_id": user.id, "items": [{"product_id": product.id, "quantity": 1}]})
+    order_id = order.json()["id"]
+
+    assert client.put(f"/orders/orders/{order_id}/status", params={"new_status": "delivered"}).status_code == 409
+    assert client.put(f"/orders/orders/{order_id}/status", params={"new_status": "cancelled"}).status_code == 200
+    assert client.put(f"/orders/orders/{order_id}/status", params={"new_status": "processing"}).status_code == 409
+    assert client.put("/orders/orders/999/status", params={"new_status": "processing"}).status_code == 404
+    db.refresh(product)
+    assert product.stock_quantity == 5  # restocked once, by the cancellation
@@ -0,0 +1,24 @@
+from backend.models import OutboxMessage
+from backend.services import outbox
+
+
+def test_dispatch_sends_outside_the_claiming_transaction(db, monkeypatch):
+    seen = []
+
+    def handler(**payload):
+        # the claim is committed before sending: no transaction (or row lock) is open
+        seen.append(db.in_transaction())
+        if payload["fail"]:
+            raise OSError("smtp down")
+
+    monkeypatch.setitem(outbox.HANDLERS, "test", handler)
+    outbox.enqueue(db, "test", fail=False)
+    outbox.enqueue(db, "test", fail=True)
+    db.commit()
+
+    assert outbox.dispatch_batch(db) == 2
+    assert seen == [False, False]
+    sent, failed = db.query(OutboxMessage).order_by(OutboxMessage.id).all()
+    assert (sent.status, sent.attempts) == (outbox.SENT, 1)
+    assert (failed.status, failed.attempts, failed.last_error) == (outbox.PENDING, 1, "OSError: smtp down")
+    assert outbox.dispatch_batch(db) == 0  # backed off, not due yet
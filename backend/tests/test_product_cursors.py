@@ -0,0 +1,39 @@
+import base64
+import json
+
+from backend.models import Product
+
+
+def crafted(values) -> str:
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip("=")
+
+
+def add_products(db, count: int):
+    db.add_all([Product(name=f"Ring {n}", metal_type="gold", karat=22, weight_grams=2,
+                        price=1000 + n, stock_quantity=1) for n in range(count)])
+    db.commit()
+
+
+def test_next_cursor_pages_through_products(client, db):
+    add_products(db, 3)
+    first = client.get("/products/", params={"sort": "price_asc", "limit": 2})
+    assert first.status_code == 200
+    rest = client.get("/products/", params={"sort": "price_asc", "limit": 2,
+                                            "cursor": first.headers["X-Next-Cursor"]})
+    assert rest.status_code == 200
+    assert [p["name"] for p in rest.json()] == ["Ring 2"]
+
+
+def test_cursor_from_another_sort_is_rejected(client, db):
+    add_products(db, 3)
+    cursor = client.get("/products/", params={"sort": "price_asc", "limit": 2}).headers["X-Next-Cursor"]
+    response = client.get("/products/", params={"sort": "newest", "cursor": cursor})
+    assert response.status_code == 400
+
+
+def test_crafted_cursors_are_rejected(client, db):
+    add_products(db, 1)
+    for cursor in ("not-base64!", crafted({"x": 1}), crafted(["price_asc", {"x": 1}, 1]),
+                   crafted(["price_asc", {"dt": 5}, 1]), crafted(["price_asc", [1], 1]), crafted([{"x": 1}, 1])):
+        response = client.get("/products/", params={"sort": "price_asc", "cursor": cursor})
+        assert response.status_code == 400, cursor
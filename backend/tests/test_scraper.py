@@ -0,0 +1,17 @@
+from pathlib import Path
+
+import pytest
+
+from backend.utils.scraper import parse_gold_prices
+
+FIXTURES = Path(__file__).parent.parent / "scripts" / "fixtures"
+EXPECTED = {24: 423800.0, 22: 388483.0, 21: 370825.0, 18: 317850.0}
+
+
+@pytest.mark.parametrize("page", ["gold_rates.html", "gold_rates_spans.html"])
+def test_parses_rate_tables(page):
+    assert parse_gold_prices((FIXTURES / page).read_text()) == EXPECTED
+
+
+def test_page_without_prices_parses_to_nothing():
+    assert parse_gold_prices((FIXTURES / "gold_rates_no_prices.html").read_text()) == {}
@@ -0,0 +1,48 @@
+from backend.models import Product
+from backend.routes import products
+
+
+def add_rings(db, karats):
+    db.add_all([Product(name=f"Ring {n}", metal_type="gold", karat=karat, weight_grams=2,
+                        price=1000 + n, stock_quantity=1) for n, karat in enumerate(karats)])
+    db.commit()
+
+
+def test_search_and_facets_share_the_candidate_cap(client, db, monkeypatch):
+    monkeypatch.setattr(products, "MAX_SEARCH_HITS", 2)
+    add_rings(db, [22] * 5)
+    facets = client.get("/products/facets", params={"query": "ring"}).json()
+    hits = client.get("/products/search", params={"query": "ring", "karat": 22}).json()
+    assert facets["karat"] == {"22": 2}
+    assert len(hits) == 2
+    sorted_hits = client.get("/products/search", params={"query": "ring", "karat": 22, "sort": "price_asc"}).json()
+    assert len(sorted_hits) == 2
+
+
+def test_index_filters_apply_before_the_cap(client, db, monkeypatch):
+    monkeypatch.setattr(products, "MAX_SEARCH_HITS", 2)
+    add_rings(db, [22, 22, 22, 18, 18])
+    hits = client.get("/products/search", params={"query": "ring", "karat": 18}).json()
+    assert sorted(hit["name"] for hit in hits) == ["Ring 3", "Ring 4"]
+    facets = client.get("/products/facets", params={"query": "ring", "karat": 18}).json()
+    assert facets["karat"] == {"18": 2}
+
+
+def test_refresh_reindexes_only_changed_text(client, db, monkeypatch):
+    from backend.services import catalog, search
+
+    monkeypatch.setattr(search, "REFRESH_SECONDS", 0)
+    add_rings(db, [22, 22])
+    assert len(client.get("/products/search", params={"query": "ring"}).json()) == 2
+
+    added = []
+    original = search.ProductSearchIndex._add
+    monkeypatch.setattr(search.ProductSearchIndex, "_add", lambda self, pid, *doc: (added.append(pid), original(self, pid, *doc)))
+    ring, other = db.query(Product).order_by(Product.id).all()
+    ring.price += 500            # a reprice: version moves, indexed text doesn't
+    other.name = "Bangle 1"
+    catalog.mark_changed(db, [ring.id, other.id])
+    db.commit()
+
+    assert [hit["name"] for hit in client.get("/products/search", params={"query": "bangle"}).json()] == ["Bangle 1"]
+    assert added == [other.id]
@@ -0,0 +1,46 @@
+from datetime import datetime, timedelta
+
+from backend.models import Product, StockSnapshot
+from backend.services import scheduler, stock_ledger
+
+
+def add_products(db, count: int) -> list[Product]:
+    products = [Product(name=f"Ring {n}", metal_type="gold", karat=22, weight_grams=2, price=1000,
+                        stock_quantity=5) for n in range(count)]
+    db.add_all(products)
+    db.commit()
+    return products
+
+
+def test_snapshots_only_cover_products_that_moved(db):
+    first, second = add_products(db, 2)
+    stock_ledger.record(db, first.id, 5, stock_ledger.INITIAL)
+    stock_ledger.record(db, second.id, 5, stock_ledger.INITIAL)
+    db.commit()
+    assert stock_ledger.take_snapshots(db) == 2
+
+    first.stock_quantity -= 2
+    stock_ledger.record(db, first.id, -2, stock_ledger.ORDER)
+    db.commit()
+    assert stock_ledger.take_snapshots(db) == 1
+    assert stock_ledger.take_snapshots(db) == 0
+    assert stock_ledger.stock_at(db, second, datetime.utcnow()) == 5
+    assert stock_ledger.stock_at(db, first, datetime.utcnow()) == 3
+
+
+def test_purge_keeps_each_products_newest_snapshot(db):
+    first, second = add_products(db, 2)
+    old = datetime.utcnow() - timedelta(days=400)
+    db.add_all([
+        StockSnapshot(product_id=first.id, quantity=5, movement_id=0, taken_at=old),
+        StockSnapshot(product_id=first.id, quantity=4, movement_id=0, taken_at=old + timedelta(days=1)),
+        StockSnapshot(product_id=second.id, quantity=5, movement_id=0, taken_at=old),
+    ])
+    db.commit()
+    assert stock_ledger.purge_snapshots(db, datetime.utcnow() - timedelta(days=365)) == 1
+    assert sorted(s.quantity for s in db.query(StockSnapshot)) == [4, 5]
+
+
+def test_only_one_worker_claims_a_run(db):
+    assert scheduler.claim_run("stock-snapshots", 3600)
+    assert not scheduler.claim_run("stock-snapshots", 3600)
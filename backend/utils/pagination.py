@@ -0,0 +1,38 @@
+# utils/pagination.py
+import base64
+import json
+from datetime import datetime
+
+
+def encode_cursor(sort: str, *values) -> str:
+    """
+    Pack the sort key of the last row on a page into an opaque, URL-safe token,
+    tagged with the ordering it belongs to so it can't be replayed against
+    another one. Datetimes are stored as ISO strings and restored by decode_cursor.
+    """
+    packed = [sort] + [{"dt": v.isoformat()} if isinstance(v, datetime) else v for v in values]
+    raw = json.dumps(packed, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _unpack(value):
+    if isinstance(value, dict):
+        return datetime.fromisoformat(value["dt"])
+    if isinstance(value, bool) or not isinstance(value, (int, float, str)):
+        raise TypeError(f"Unexpected cursor value {value!r}")
+    return value
+
+
+def decode_cursor(cursor: str, sort: str, size: int) -> list:
+    """
+    Reverse of encode_cursor. Raises ValueError for tokens that were not
+    produced by encode_cursor for this sort or carry the wrong number of values.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+        if not isinstance(values, list) or len(values) != size + 1 or values[0] != sort:
+            raise ValueError
+        return [_unpack(v) for v in values[1:]]
+    except (KeyError, TypeError, ValueError):
+        raise ValueError("Malformed cursor")
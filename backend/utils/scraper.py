@@ -1,32 +1,81 @@
+import re
+
 import requests
 from bs4 import BeautifulSoup
 from backend.configs import settings
+from backend.services.logger import logger
+
+KARATS = (24, 22, 21, 18)
+
+# A karat label ("24K", "22 K", "21 Karat") followed, within a few hundred
+# characters and before the next karat label, by the first *price*: a number
+# after a currency mark (Rs / PKR) or one written with thousands separators.
+# Bare small numbers in between ("1 Tola", "10 Gram") are skipped.
+_PRICE_RE = re.compile(
+    r"\b(24|22|21|18)\s?K(?:arat)?\b"
+    r"(?:(?!\b(?:24|22|21|18)\s?K(?:arat)?\b).){0,400}?"
+    r"(?:(?:Rs\.?|PKR)(?:\s|&nbsp;|<[^<>]{0,200}>|:)*(\d+(?:,\d{3})*(?:\.\d+)?)"
+    r"|(\d{1,3}(?:,\d{3})+(?:\.\d+)?))",
+    re.IGNORECASE | re.DOTALL,
+)
+
+_session = requests.Session()
+
+
+def parse_gold_prices(html: str) -> dict[int, float]:
+    """
+    Per-tola price for each karat found in the page, in a single regex pass
+    over the raw HTML (no parse tree, no copies of the text). Only the first
+    price after each label counts, and a karat quoted above the 24K price is
+    dropped as a misread. Returns {} when 24K can't be found.
+    """
+    prices: dict[int, float] = {}
+    for match in _PRICE_RE.finditer(html):
+        karat = int(match.group(1))
+        if karat not in prices:
+            prices[karat] = float((match.group(2) or match.group(3)).replace(",", ""))
+            if len(prices) == len(KARATS):
+                break
+    price_24k = prices.get(24)
+    if not price_24k:
+        return {}
+    return {karat: price for karat, price in prices.items() if 0 < price <= price_24k}
+
 
-def scrape_gold_prices() -> dict[str, float] | None:
+def parse_gold_prices_legacy(html: str) -> dict[int, float]:
+    """The original text-splitting parser, kept as a fallback for layouts the regex doesn't cover."""
+    text = BeautifulSoup(html, "html.parser").get_text()
+    prices = {}
+    for karat in KARATS:
+        try:
+            # Find the first number after the karat
+            price_str = text.split(f"{karat}K")[1].split()[0].replace(",", "")
+            prices[karat] = float(price_str)
+        except (IndexError, ValueError):
+            pass  # Price not found
+    return prices
+
+
+def scrape_gold_prices() -> dict[int, float] | None:
     """
     Scrape gold prices (24K, 22K, 21K, 18K) per tola from the GOLD_SCRAPER_URL.
     Returns a dictionary with karat as key and price as float.
-    Example: {"24K": 215000.0, "22K": 198000.0, ...}
-    Returns None if scraping fails.
+    Example: {24: 215000.0, 22: 198000.0, ...}
+    Returns None if scraping fails or no 24K price can be found.
     """
     try:
-        url = settings.GOLD_SCRAPER_URL
-        res = requests.get(url, timeout=10)
+        res = _session.get(settings.GOLD_SCRAPER_URL, timeout=10)
         res.raise_for_status()  # Raise exception for bad responses
-        soup = BeautifulSoup(res.text, "html.parser")
-        text = soup.get_text()
-
-        gold_prices = {}
-        for karat in ["24K", "22K", "21K", "18K"]:
-            try:
-                # Find the first number after the karat
-                price_str = text.split(karat)[1].split()[0].replace(",", "")
-                gold_prices[karat] = float(price_str)
-            except (IndexError, ValueError):
-                gold_prices[karat] = None  # Price not found
-
-        return gold_prices
-
-    except Exception as e:
-        print("Scraping failed:", e)
+    except requests.RequestException as e:
+        logger.warning(f"Scraping failed: {e}")
         return None
+
+    prices = parse_gold_prices(res.text)
+    if not prices:
+        prices = parse_gold_prices_legacy(res.text)
+        if prices.get(24):
+            logger.warning("Gold rate page layout not recognised; used the fallback parser")
+        else:
+            logger.warning("Gold rate page has no readable 24K price")
+            return None
+    return prices